@@ -39,6 +39,7 @@ def main(daemon: bool=False):
             os.remove(os.path.join(conf.root, "lock"))
 
         from hakase.core.bot import Bot
+        from hakase.core.log import stop_listeners
         conf.daemon = daemon
         bot = Bot(conf)
 
@@ -48,7 +49,9 @@ def main(daemon: bool=False):
             if not os.path.exists(os.path.join(conf.root, "lock")):
                 if os.path.exists(os.path.join(conf.root, "pidfile")):
                     os.remove(os.path.join(conf.root, "pidfile"))
-                os.system(f"{sys.executable} {' '.join(sys.argv)}")
+                # Replace this process rather than nesting a new one inside it.
+                stop_listeners()
+                os.execv(sys.executable, [sys.executable] + sys.argv)
             else:
                 bot.logger.warning("Lock file exists, permanent shutdown.")
             sys.exit(0)
@@ -8,22 +8,32 @@ import lolpython
 import miru
 import os
 import pyfiglet
+import sys
+import time
+import types
 import typing as t
 import zoneinfo
 
 from .log import logger
 from .http import HTTPDaemon
 from .conf import Config
+from ..lib.http import HTTPClient, client as http_client
+from ..lib.imports import timed_imports, report
 from ..lib.utils import utcnow
 from ..lib.injection import load_injection_for_commands
-from ..lib.permissions import Node, AccessIsDenied
-from ..lib.hooks import require_not_denied
+from ..lib.permissions import ACLCache, Node, AccessIsDenied
+from ..lib.hooks import require_not_denied, start_command_timer, record_command_duration, observe_command_duration
+from ..lib.hooks import start_trace, begin_invoke_span, finish_trace, end_trace, begin_unit_of_work
+from ..lib.metrics import registry, instrument_database, instrument_gateway, instrument_rest
+from ..lib.watchdog import LoopWatchdog
 from ..lib.utils import strfdelta
 from ..daemons import run_daemons
 from ..mvc.discord.hooks import DiscordEventHandler
+from ..mvc.discord.role_groups import role_groups
 from ..mvc.discord.models import Channel, RoleGroup
 from ..mvc.internal.models import OperationalVariables, Revision
 from ..mvc.starboard.models import Starboard
+from ..mvc.starboard.router import router as starboard_router
 
 
 class Bot(hikari.GatewayBot):
@@ -52,6 +62,12 @@ class Bot(hikari.GatewayBot):
     permissions_root : Node
         The root node of the bot's permissions tree. Initializes to None, but
         is set when the tree is resolved upon boot.
+    acl_cache : ACLCache
+        The cache of compiled effective ACLs used by the permissions hooks.
+    http_client : HTTPClient
+        The shared, pooled client used for all outbound HTTP requests.
+    watchdog : LoopWatchdog
+        Watches for anything blocking the event loop.
     lightbulb : lightbulb.Client
         Lightbulb's client, command handler.
     miru : miru.Client
@@ -73,9 +89,19 @@ class Bot(hikari.GatewayBot):
         self.last_connection: t.Optional[datetime.datetime] = None
         self._revision: t.Optional[Revision] = None
         self._permissions_root: t.Optional[Node] = None
+        self._loaded_code: t.Optional[t.Dict[str, str]] = None
+        self.acl_cache: ACLCache = ACLCache()
+        self.acl_cache.connect()
+        starboard_router.connect()
+        role_groups.connect()
+        self.http_client: HTTPClient = http_client
+        self.watchdog: LoopWatchdog = LoopWatchdog(threshold=conf.telemetry.loop_lag_threshold_seconds)
 
         # Handle lightbulb
-        self.lightbulb: lightbulb.Client = lightbulb.client_from_app(self, hooks=[require_not_denied])
+        self.lightbulb: lightbulb.Client = lightbulb.client_from_app(
+            self,
+            hooks=[start_command_timer, start_trace, begin_unit_of_work, require_not_denied, begin_invoke_span, finish_trace, record_command_duration]
+        )
         self.lightbulb.error_handler(self._on_exc_pipeline_error)
         
         # Handle miru
@@ -84,9 +110,21 @@ class Bot(hikari.GatewayBot):
         # Handle HTTP Daemon
         self.http_daemon: t.Optional[HTTPDaemon] = None
 
+        # Instrument everything the metrics endpoint reports on.
+        instrument_database()
+        instrument_gateway(self.event_manager)
+        instrument_rest(self.rest)
+        registry.gauge("hakase_acl_cache_compiled", "Compiled ACLs currently cached.").set_function(lambda: len(self.acl_cache._compiled))
+        registry.gauge("hakase_http_requests_in_flight", "Outbound HTTP requests currently in flight.").set_function(
+            lambda: self.http_client.in_flight
+        )
+
         # Define events
         self.subscribe(hikari.StartingEvent, self._load_command_handler)
         self.subscribe(hikari.ShardReadyEvent, self._on_ready)
+        self.subscribe(hikari.StoppingEvent, self.http_client.close)
+        self.subscribe(hikari.StartingEvent, self.watchdog.start)
+        self.subscribe(hikari.StoppingEvent, self.watchdog.stop)
 
         # These events allow the MVC to handle Discord objects.
         self.subscribe(hikari.GuildEvent, DiscordEventHandler.handle_guild_event)
@@ -96,11 +134,17 @@ class Bot(hikari.GatewayBot):
 
         # These events allow the MVC to track guild activity.
         self.subscribe(hikari.MemberUpdateEvent, RoleGroup.process_event)
+        self.subscribe(hikari.MemberUpdateEvent, self.acl_cache.handle_member_update)
         self.subscribe(hikari.GuildReactionAddEvent, Starboard.process_event)
+        self.subscribe(hikari.GuildReactionDeleteEvent, Starboard.process_event)
 
     async def _load_command_handler(self, _) -> None:
         """Load Lightbulb."""
-        await self.lightbulb.load_extensions("hakase.ext")
+        start = time.perf_counter()
+        with timed_imports() as times:
+            await self.lightbulb.load_extensions("hakase.ext")
+        elapsed = round((time.perf_counter() - start) * 1000, 1)
+        self.logger.info(f"Loaded extensions in {elapsed}ms. Slowest imports: {report(times, limit=5)}.")
 
         await self.lightbulb.start()
         load_injection_for_commands(self.lightbulb)
@@ -111,6 +155,9 @@ class Bot(hikari.GatewayBot):
         
         These occur when execution of a command fails for whatever reason.
         """
+        outcome = "denied" if isinstance(exc.causes[0], AccessIsDenied) else "error"
+        observe_command_duration(exc.context, outcome)
+        await end_trace(outcome)
         if isinstance(exc.causes[0], AccessIsDenied):
             await exc.context.respond(exc.causes[0].message)
             return True
@@ -155,6 +202,8 @@ class Bot(hikari.GatewayBot):
         self._permissions_root: Node = Node.build_from_client(self.lightbulb)
         await DiscordEventHandler.run_model_update(self)
         self._revision: Revision = await Revision.calculate()
+        if self._loaded_code is None:
+            self._loaded_code = Revision.get_manifest().snapshot()
         self.http_daemon = await HTTPDaemon.run(self)
 
         self.is_ready.set()
@@ -196,6 +245,83 @@ class Bot(hikari.GatewayBot):
             raise RuntimeError("Permissions root has not been set yet.")
         return self._permissions_root
     
+    async def reinitialize(self, ctx=None) -> t.Optional[datetime.timedelta]:
+        """
+        Reinitialize hakase, in place if at all possible.
+
+        If the only code which changed since it was loaded lives in
+        hakase.ext, the command extensions are reloaded through lightbulb,
+        and everything else, (the gateway connection, Django, the database
+        connections, caches) is kept as is. Otherwise, a full restart is
+        required, and close() is called instead.
+
+        Parameters
+        ----------
+        ctx : lightbulb.Context
+            The context in which this method was called, if any.
+
+        Returns
+        -------
+        datetime.timedelta | None
+            The time the reinitialization took if it happened in place,
+            otherwise None. None is also returned if the new extensions
+            failed to load, in which case the old ones are kept running.
+        """
+        start = utcnow()
+        ext = os.path.relpath(os.path.join(os.path.dirname(os.path.dirname(__file__)), "ext"), self.conf.root)
+        manifest = Revision.get_manifest()
+        await manifest.scan()
+        changed = manifest.diff(self._loaded_code or {})
+        outside = [path for path in changed if not path.startswith(os.path.join(ext, ""))]
+        if outside:
+            self.logger.warning(f"{len(outside)} changed file(s) outside of {ext}, a full restart is required.")
+            await self.close(ctx=ctx)
+            return None
+
+        self.logger.info(f"Reinitializing in place, {len(changed)} changed file(s).")
+        self.conf.reload()
+        previous = {name: module for name, module in sys.modules.items() if name == "hakase.ext" or name.startswith("hakase.ext.")}
+        # Only the package itself is handed to lightbulb, so its submodules
+        # are dropped here, or the package would just re-import the old ones.
+        for name in previous:
+            if name != "hakase.ext":
+                sys.modules.pop(name, None)
+
+        # If the new code fails to load, lightbulb puts the old package back,
+        # and the old submodules are then restored along with it. Errors which
+        # lightbulb doesn't catch, (a SyntaxError isn't an ImportError) leave
+        # nothing loaded at all, so the old package is loaded again by hand.
+        try:
+            await self.lightbulb.reload_extensions("hakase.ext")
+            failed = sys.modules.get("hakase.ext") is previous.get("hakase.ext", object())
+        except Exception as e:
+            self.logger.exception(f"Error reloading the command extensions: {e}")
+            failed = True
+            self._restore_modules(previous)
+            await self.lightbulb.load_extensions("hakase.ext")
+
+        if failed:
+            self._restore_modules(previous)
+            self.logger.error("Reloading the command extensions failed, the previous ones were kept.")
+            if ctx:
+                await ctx.respond("Reloading the command extensions failed, so the previous ones were kept. Check the logs.")
+            return None
+        await self.lightbulb.sync_application_commands()
+
+        self._permissions_root = Node.build_from_client(self.lightbulb)
+        await self._permissions_root.ensure_objects()
+        await self._permissions_root.delete_unused()
+        self.acl_cache.clear()
+        self._revision = await Revision.calculate()
+        self._loaded_code = manifest.snapshot()
+        return utcnow() - start
+
+    @staticmethod
+    def _restore_modules(previous: t.Dict[str, types.ModuleType]) -> None:
+        for name in [name for name in sys.modules if name == "hakase.ext" or name.startswith("hakase.ext.")]:
+            sys.modules.pop(name, None)
+        sys.modules.update(previous)
+
     async def close(self, ctx=None, kill=False) -> None:
         """
         Restart or kill hakase.
@@ -11,6 +11,8 @@ generated upon first initialization which defines operational settings for Hakas
     * ORMConfigSchema - Schema defining configuration for the MVC
     * LavalinkConfigSchema - Schema defining configuration for lavalink
     * VarsConfigSchema - Schema defining a bunch of random settings
+    * HTTPConfigSchema - Schema defining outbound HTTP client settings
+    * TelemetryConfigSchema - Schema defining runtime metrics settings
     * ConfigSchema - Schema defining the entire configuration
     * Config - Class which constructs the config namespace
 """
@@ -18,7 +20,7 @@ generated upon first initialization which defines operational settings for Hakas
 import aiofile
 import fernet
 import os
-from marshmallow import Schema, fields, post_load
+from marshmallow import Schema, fields, post_load, validate
 from types import SimpleNamespace
 from pathlib import Path
 import toml
@@ -56,12 +58,23 @@ class LoggingConfigSchema(BaseConfig):
         The format for the logs.
     date_format : str
         The format for dates in logs.
+    json_sink : boolean
+        Whether or not logs should also be written as JSON lines to bot.jsonl,
+        for machine ingestion.
+    sampled_loggers : t.List[str]
+        The names of loggers whose records are sampled, rather than all kept.
+        Useful for hot loggers like uvicorn.access.
+    sample_rate : float
+        The fraction of records from sampled loggers which are kept.
     """
     main_level = LogLevel(dump_default="INFO", required=True)
     hikari_level = LogLevel(dump_default="CRITICAL", required=True)
     mvc_level = LogLevel(dump_default="WARNING", required=True)
     log_format = fields.Str(dump_default='[%(asctime)s][%(levelname)s][%(name)s] %(message)s', required=True)
     date_format = fields.Str(dump_default="%x %X", required=True)
+    json_sink = fields.Boolean(dump_default=False, load_default=False)
+    sampled_loggers = fields.List(fields.Str, dump_default=["uvicorn.access"], load_default=lambda: ["uvicorn.access"])
+    sample_rate = fields.Float(dump_default=1.0, load_default=1.0, validate=validate.Range(0.0, 1.0))
 
 
 class ORMConfigSchema(BaseConfig):
@@ -140,6 +153,63 @@ class VarsConfigSchema(BaseConfig):
     choose_cmd_expiry_seconds = fields.Int(dump_default=3600, required=True)
 
 
+class HTTPConfigSchema(BaseConfig):
+    """
+    Schema defining configuration for outbound HTTP requests.
+
+    All of the bot's outbound HTTP requests share a single connection pool,
+    and this section controls its behavior.
+
+    Attributes
+    ----------
+    pool_size : int
+        The maximum number of simultaneous connections.
+    per_host_limit : int
+        The maximum number of simultaneous connections to a single host.
+    keepalive_seconds : float
+        The number of seconds idle connections are kept open for reuse.
+    timeout_seconds : float
+        The total number of seconds a request may take.
+    """
+    pool_size = fields.Int(dump_default=100, required=True)
+    per_host_limit = fields.Int(dump_default=10, required=True)
+    keepalive_seconds = fields.Float(dump_default=30.0, required=True)
+    timeout_seconds = fields.Float(dump_default=15.0, required=True)
+
+
+class TelemetryConfigSchema(BaseConfig):
+    """
+    Schema defining configuration for runtime metrics.
+
+    Metrics are served in the Prometheus text format on /metrics by
+    the HTTP daemon.
+
+    Attributes
+    ----------
+    enable_metrics : boolean
+        Whether or not the metrics endpoint should be served.
+    metrics_token : str
+        Requests to the metrics endpoint must carry this as a bearer token
+        in their Authorization header. The endpoint isn't served at all
+        until this is set, even if it is enabled.
+    slow_command_seconds : float
+        Commands taking at least this long have their trace logged, and
+        their profile written to the profiles folder under logs, if sampled.
+    profile_sample_rate : float
+        The fraction of commands which are profiled. Profiling covers everything
+        running on the event loop at the time, not just the command, so this is
+        off by default.
+    loop_lag_threshold_seconds : float
+        The number of seconds the event loop must be blocked for before
+        the blocking code's stack is logged.
+    """
+    enable_metrics = fields.Boolean(dump_default=False, required=True)
+    metrics_token = fields.Str(dump_default="", required=True)
+    slow_command_seconds = fields.Float(dump_default=2.0, load_default=2.0)
+    profile_sample_rate = fields.Float(dump_default=0.0, load_default=0.0, validate=validate.Range(0.0, 1.0))
+    loop_lag_threshold_seconds = fields.Float(dump_default=0.25, load_default=0.25)
+
+
 class ConfigSchema(BaseConfig):
     """
     Top level config schema.
@@ -175,6 +245,10 @@ class ConfigSchema(BaseConfig):
         The ORM config schema. Don't touch.
     vars : VarsConfigSchema
         The vars config schema. Don't touch.
+    http : HTTPConfigSchema
+        The HTTP config schema. Don't touch.
+    telemetry : TelemetryConfigSchema
+        The telemetry config schema. Don't touch.
     """
     name = fields.Str(dump_default="Hakase", required=True)
     timezone = Timezone(dump_default="UTC", required=True)
@@ -187,6 +261,8 @@ class ConfigSchema(BaseConfig):
     logging = fields.Nested(LoggingConfigSchema, dump_default=LoggingConfigSchema().dump({}))
     mvc = fields.Nested(ORMConfigSchema, dump_default=ORMConfigSchema().dump({}))
     vars = fields.Nested(VarsConfigSchema, dump_default=VarsConfigSchema().dump({}))
+    http = fields.Nested(HTTPConfigSchema, dump_default=HTTPConfigSchema().dump({}), load_default=lambda: HTTPConfigSchema().dump({}))
+    telemetry = fields.Nested(TelemetryConfigSchema, dump_default=TelemetryConfigSchema().dump({}), load_default=lambda: TelemetryConfigSchema().dump({}))
 
     @post_load
     def make(self, data, **kwargs):
@@ -208,6 +284,8 @@ class Config(SimpleNamespace):
         Whether or not the bot should run as a daemon. This is overwritten by
         sys.argv later.
     """
+    _instance = None
+
     def __init__(self, **entries):
         self.version: SimpleNamespace = SimpleNamespace(**{'number': __VERSION__, 'tag': __TAG__})
         # To be overriden by sys.argv.
@@ -263,24 +341,43 @@ class Config(SimpleNamespace):
         return config_list
     
     @classmethod
-    async def aload(self):
+    def _read(cls) -> "Config":
+        try:
+            with open("conf.toml", "r") as config_file:
+                return ConfigSchema().load(toml.load(config_file))
+        except FileNotFoundError:
+            config_dict = ConfigSchema().dump({})
+            with open("conf.toml", "w") as config_file:
+                toml.dump(config_dict, config_file)
+            return ConfigSchema().load(config_dict)
+
+    @classmethod
+    async def aload(cls):
         """
         Asynchronous loading of config.
 
         Most of the time, this isn't necessary, and load() is used instead.
+        Like load(), the config is only ever read once per process.
         """
+        if cls._instance is not None:
+            return cls._instance
+
         try:
             async with aiofile.async_open('conf.toml', mode='r') as config_file:
                 contents = await config_file.read()
-                return ConfigSchema().load(toml.loads(contents))
+                conf = ConfigSchema().load(toml.loads(contents))
         except FileNotFoundError:
             config_dict = ConfigSchema().dump({})
             async with aiofile.async_open('conf.toml', mode='w') as config_file:
-                await config_file.write(toml.dump(config_dict, config_file))
-            return ConfigSchema().load(config_dict)
+                await config_file.write(toml.dumps(config_dict))
+            conf = ConfigSchema().load(config_dict)
+
+        if cls._instance is None:
+            cls._instance = conf
+        return cls._instance
     
     @classmethod
-    def load(self, orm=False):
+    def load(cls, orm=False):
         """
         Load the config.
 
@@ -289,6 +386,11 @@ class Config(SimpleNamespace):
         ConfigSchema.load(). In the event that no file is found,
         one is created.
 
+        The file is only read and validated the first time this is
+        called. Every later call returns the same object, so that
+        loading the config at import time costs nothing. Use reload()
+        to pick up changes to the file.
+
         The ORM may also optionally be configured, which is usually
         necessary if the file using the config is going to access the
         database.
@@ -298,16 +400,30 @@ class Config(SimpleNamespace):
         orm : boolean
             Whether or not the should also be configured.
         """
-        try:
-            with open("conf.toml", "r") as config_file:
-                conf = ConfigSchema().load(toml.load(config_file))
-        except FileNotFoundError:
-            config_dict = ConfigSchema().dump({})
-            with open("conf.toml", "w") as config_file:
-                toml.dump(config_dict, config_file)
-            conf = ConfigSchema().load(config_dict)
+        if cls._instance is None:
+            cls._instance = cls._read()
         
         if orm is True:
-            from hakase.mvc.core.settings import configure
-            configure()
-        return conf
+            from django.conf import settings
+            if not settings.configured:
+                from hakase.mvc.core.settings import configure
+                configure()
+        return cls._instance
+
+    @classmethod
+    def reload(cls):
+        """
+        Re-read the config from the toml file.
+
+        The shared config object is updated in place, so every module
+        holding a reference to it sees the new values. The daemon flag,
+        which comes from sys.argv rather than the file, is kept.
+        """
+        conf = cls._read()
+        if cls._instance is None:
+            cls._instance = conf
+        else:
+            conf.daemon = cls._instance.daemon
+            cls._instance.__dict__.clear()
+            cls._instance.__dict__.update(conf.__dict__)
+        return cls._instance
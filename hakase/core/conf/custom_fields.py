@@ -1,5 +1,6 @@
 """Module defines custom fields for the core config
 
+    * available_timezones - Cached set of every available zoneinfo timezone
     * Timezone - A zoneinfo timezone field
     * LogLevel - A log level field
     * DiscordUID - A unique Discord ID
@@ -7,15 +8,23 @@
     * ExistingPath - A POSIX path to a location on the system 
 """
 
+import functools
 import os
+import typing as t
 import zoneinfo
 from marshmallow import fields, validate, ValidationError
 
 
+@functools.cache
+def available_timezones() -> t.FrozenSet[str]:
+    """Every available zoneinfo timezone. Computing this scans the tz database, so it's only done once."""
+    return frozenset(zoneinfo.available_timezones())
+
+
 class Timezone(fields.Str):
     """A field containing a zoneinfo timezone."""
     def __init__(self, *args, **kwargs):
-        kwargs['validate'] = validate.OneOf(zoneinfo.available_timezones())
+        kwargs['validate'] = validate.OneOf(available_timezones())
         super().__init__(*args, **kwargs)
 
 
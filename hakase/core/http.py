@@ -1,15 +1,18 @@
 from django.core.management import execute_from_command_line
+import asyncio
+import hashlib
 import hikari
-import logging
 import os
 import hikari.internal
 import uvicorn
 
 from .conf import Config
+from .log import queued_file_handler
 from ..lib.utils import port_in_use
 
 
 conf: Config = Config.load()
+STATIC_FINGERPRINT = ".fingerprint"
 
 
 uvicorn.config.LOGGING_CONFIG['formatters']['default']['fmt'] = conf.logging.log_format
@@ -18,10 +21,8 @@ uvicorn.config.LOGGING_CONFIG['formatters']['access']['fmt'] = conf.logging.log_
 uvicorn.config.LOGGING_CONFIG['formatters']['access']['use_colors'] = True
 uvicorn.config.LOGGING_CONFIG['handlers']['file'] = {
     'formatter': 'access',
-    '()': lambda: logging.handlers.TimedRotatingFileHandler(
-        os.path.join(conf.logs, "access.log"),
-        when="midnight"
-    )
+    '()': queued_file_handler,
+    'filename': "access.log"
 }
 uvicorn.config.LOGGING_CONFIG['loggers']['uvicorn.access']['handlers'] = ['file']
 
@@ -44,6 +45,46 @@ class HTTPDaemon(uvicorn.Server):
     async def serve(self, *args, **kwargs) -> None:
         """Serve the webserver."""
         return await super().serve(*args, **kwargs)
+
+    @staticmethod
+    def static_fingerprint() -> str:
+        """
+        Compute a fingerprint of every source static file.
+
+        The fingerprint covers the path, size and mtime of every file
+        the staticfiles finders would collect, so it changes whenever
+        collectstatic would have something to do.
+        """
+        from django.contrib.staticfiles import finders
+
+        entries = []
+        for finder in finders.get_finders():
+            for path, storage in finder.list(["CVS", ".*", "*~"]):
+                stat = os.stat(storage.path(path))
+                prefix = getattr(storage, "prefix", None) or ""
+                entries.append((os.path.join(prefix, path), stat.st_size, stat.st_mtime_ns))
+
+        hash = hashlib.sha512()
+        for entry in sorted(entries):
+            hash.update(repr(entry).encode("utf-8"))
+        return hash.hexdigest()
+
+    @classmethod
+    def collect_static(cls, bot: hikari.GatewayBot) -> None:
+        """Run collectstatic, unless the source static files haven't changed since it last ran."""
+        path = os.path.join(conf.mvc.static_root, STATIC_FINGERPRINT)
+        fingerprint = cls.static_fingerprint()
+        try:
+            with open(path, "r") as file:
+                if file.read() == fingerprint:
+                    bot.logger.debug("Static files are unchanged, skipping collectstatic.")
+                    return
+        except FileNotFoundError:
+            pass
+
+        execute_from_command_line(["", "collectstatic", "--noinput"])
+        with open(path, "w") as file:
+            file.write(fingerprint)
     
     @classmethod
     async def run(cls, bot: hikari.GatewayBot):
@@ -52,7 +93,7 @@ class HTTPDaemon(uvicorn.Server):
             bot.logger.error(f"HTTP Daemon failed to start on {conf.mvc.host}:{conf.mvc.port}. It is already in use.")
             return
         
-        execute_from_command_line(["", "collectstatic", "--noinput"])
+        await asyncio.to_thread(cls.collect_static, bot)
 
         loop = hikari.internal.aio.get_or_make_loop()
         loop.bot = bot
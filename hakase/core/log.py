@@ -1,15 +1,123 @@
+"""Module defining the logging pipeline
+
+Log calls happen on the event loop, so nothing on that path may touch the
+disk. Records are put on a queue by a QueuedHandler, and a QueueListener
+formats and writes them with the real handlers on a background thread.
+
+    * QueuedHandler - Handler which hands records off to a background thread
+    * SamplingFilter - Filter keeping only a fraction of the records of certain loggers
+    * JSONFormatter - Formatter rendering records as single-line JSON objects
+    * queued_file_handler - Function creating a queued, daily rotating file handler
+    * stop_listeners - Function flushing and stopping every background logging thread
+    * logger - The root logger
+"""
+import atexit
+import datetime
 import logging.handlers
 import colorlog
 import logging
+import orjson as json
 import os
+import queue
+import random
+import typing as t
 
 from .conf import Config
 
 
 conf: Config = Config.load()
+LISTENERS: t.List[logging.handlers.QueueListener] = []
+
+
+class QueuedHandler(logging.handlers.QueueHandler):
+    """
+    A handler which hands records to a background thread.
+
+    The wrapped handlers are driven by a QueueListener, so formatting and
+    I/O both happen off the calling thread. Each wrapped handler's level
+    is respected.
+
+    Parameters
+    ----------
+    *handlers : logging.Handler
+        The handlers which should ultimately handle the records.
+    """
+    def __init__(self, *handlers: logging.Handler):
+        super().__init__(queue.SimpleQueue())
+        self.handlers: t.Tuple[logging.Handler, ...] = handlers
+        self.setLevel(min([handler.level for handler in handlers]))
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        LISTENERS.append(self.listener)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the wrapped handlers, on the listener's thread.
+        return record
+
+    def setFormatter(self, fmt: logging.Formatter) -> None:
+        """Set the formatter of every wrapped handler, as this handler never formats anything itself."""
+        for handler in self.handlers:
+            handler.setFormatter(fmt)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    A filter keeping only a fraction of the records of certain loggers.
+
+    Warnings and above are always kept.
+
+    Parameters
+    ----------
+    loggers : t.List[str]
+        The names of the loggers to sample.
+    rate : float
+        The fraction of records to keep, from 0.0 to 1.0.
+    """
+    def __init__(self, loggers: t.List[str], rate: float):
+        super().__init__()
+        self.loggers: t.FrozenSet[str] = frozenset(loggers)
+        self.rate: float = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate >= 1.0 or record.levelno >= logging.WARNING or record.name not in self.loggers:
+            return True
+        return random.random() < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    """A formatter rendering records as single-line JSON objects."""
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str).decode("utf-8")
+
+
+def queued_file_handler(filename: str, level: t.Union[str, int]=logging.NOTSET) -> QueuedHandler:
+    """Create a queued, daily rotating file handler writing to filename under the logs directory."""
+    handler = logging.handlers.TimedRotatingFileHandler(os.path.join(conf.logs, filename), when="midnight")
+    handler.setLevel(level)
+    queued = QueuedHandler(handler)
+    queued.addFilter(sampling_filter)
+    return queued
+
+
+def stop_listeners() -> None:
+    """Flush and stop every background logging thread."""
+    while LISTENERS:
+        LISTENERS.pop().stop()
 
 
 logging.root.setLevel(logging.NOTSET)
+sampling_filter: SamplingFilter = SamplingFilter(conf.logging.sampled_loggers, conf.logging.sample_rate)
 
 stream_handler: colorlog.StreamHandler = colorlog.StreamHandler()
 stream_handler.setLevel(conf.logging.main_level)
@@ -25,7 +133,7 @@ stream_handler.setFormatter(
             'ERROR': 'light_red',
             'CRITICAL': 'light_purple'
         }
-    ) 
+    )
 )
 
 file_handler: logging.handlers.TimedRotatingFileHandler = logging.handlers.TimedRotatingFileHandler(
@@ -35,6 +143,20 @@ file_handler: logging.handlers.TimedRotatingFileHandler = logging.handlers.Timed
 file_handler.setLevel(conf.logging.main_level)
 file_handler.setFormatter(logging.Formatter(conf.logging.log_format))
 
+handlers: t.List[logging.Handler] = [stream_handler, file_handler]
+if conf.logging.json_sink:
+    json_handler: logging.handlers.TimedRotatingFileHandler = logging.handlers.TimedRotatingFileHandler(
+        os.path.join(conf.logs, "bot.jsonl"),
+        when="midnight"
+    )
+    json_handler.setLevel(conf.logging.main_level)
+    json_handler.setFormatter(JSONFormatter())
+    handlers.append(json_handler)
+
+queued_handler: QueuedHandler = QueuedHandler(*handlers)
+queued_handler.addFilter(sampling_filter)
+
 logger: logging.Logger = colorlog.getLogger()
-logger.addHandler(stream_handler)
-logger.addHandler(file_handler)
\ No newline at end of file
+logger.addHandler(queued_handler)
+
+atexit.register(stop_listeners)
@@ -7,10 +7,12 @@ periodically executed as apart of her natural behavior in the background.
 import hikari
 
 from .reminders import check_reminders
+from .usage import update_directory_usage
 
 
 __all__ = [
-    check_reminders
+    check_reminders,
+    update_directory_usage
 ]
 
 
@@ -0,0 +1,23 @@
+import hikari
+
+from ..core.conf import Config
+from ..lib.daemon import daemon
+from ..lib.usage import usage
+
+
+conf = Config.load()
+
+
+@daemon(minutes=5)
+async def update_directory_usage(bot: hikari.GatewayBot) -> None:
+    """
+    Recompute the sizes of the bot's directories in the background, so that
+    they can be served from memory when someone asks for them.
+
+    Args:
+      bot: hikari.GatewayBot: The bot object.
+
+    Returns:
+        None
+    """
+    await usage.refresh(conf.root, conf.temp, conf.logs)
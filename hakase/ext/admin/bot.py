@@ -4,7 +4,9 @@ import platform
 import sys
 
 from ...core.conf import Config
-from ...lib.utils import get_byte_unit, get_dir_size
+from ...lib.hooks import require_owner
+from ...lib.usage import usage
+from ...lib.utils import get_byte_unit, strfdelta
 from ...mvc.internal.models import Revision
 
 
@@ -33,12 +35,27 @@ class Info(
 
         embed.add_field("Code Statistics", value=f"Lines: {lines}\nChars: {chars}")
 
-        root = get_byte_unit(get_dir_size(conf.root))
-        temp = get_byte_unit(get_dir_size(conf.temp))
-        logs = get_byte_unit(get_dir_size(conf.logs))
+        root = get_byte_unit(await usage.aget(conf.root))
+        temp = get_byte_unit(await usage.aget(conf.temp))
+        logs = get_byte_unit(await usage.aget(conf.logs))
         dirs = f"Root: {root}\nTemp: {temp}\nLogs: {logs}"
         embed.add_field("Directory Info", value=dirs)
 
         heartbeat_info = f"Period: {latency} ms\nFrequency: {frequency} Hz"
         embed.add_field("Heartbeat Info", value=heartbeat_info)
-        await ctx.respond(embed)
\ No newline at end of file
+        await ctx.respond(embed)
+
+
+@bot.register
+class Reinit(
+    lightbulb.SlashCommand,
+    name="reinit",
+    description=f"Reinitialize {conf.name}.",
+    hooks=[require_owner]
+):
+    @lightbulb.invoke
+    async def invoke(self, ctx: lightbulb.Context) -> None:
+        await ctx.respond("Reinitializing.")
+        elapsed = await ctx.client.app.reinitialize(ctx=ctx)
+        if elapsed is not None:
+            await ctx.respond(f"Reinitialized in place. Time elapsed was {strfdelta(elapsed, '{%M}:{%S}')}.")
@@ -5,7 +5,6 @@ import hikari
 import lightbulb
 import orjson as json
 import os
-import py_expression_eval
 import random
 import zoneinfo
 
@@ -13,6 +12,8 @@ from ...core.conf import Config
 from .dice import dice
 from ...lib.utils import aio_get, utcnow, execute_in_background
 from ...lib.ctx import as_embed
+from ...lib.http import PrefetchBuffer
+from ...lib.imports import lazy_import
 from ...lib.timer import BackgroundTimer, BackgroundTimerError
 from ...mvc.discord.models import User, Locale
 from ...mvc.reminders.models import Reminder
@@ -20,6 +21,7 @@ from ...lib.components import WelcomeView
 
 
 conf = Config.load()
+py_expression_eval = lazy_import("py_expression_eval")
 tools = lightbulb.Loader()
 tools.command(dice)
 
@@ -44,13 +46,17 @@ class Cat(
 ):
     ENDPOINT = "https://cataas.com"
 
-    @lightbulb.invoke
-    async def invoke(self, ctx: lightbulb.Context):
+    @staticmethod
+    async def fetch_url() -> str:
         data = await aio_get(
-            f"{self.ENDPOINT}/cat?json=true",
+            f"{Cat.ENDPOINT}/cat?json=true",
             headers={'Accept': 'text/plain'}
         )
-        await ctx.respond(as_embed(json.loads(data)['url']))
+        return json.loads(data)['url']
+
+    @lightbulb.invoke
+    async def invoke(self, ctx: lightbulb.Context):
+        await ctx.respond(as_embed(await cat_urls.get()))
 
 
 @tools.command
@@ -61,10 +67,19 @@ class Dog(
 ):
     ENDPOINT = "https://random.dog/woof.json"
 
+    @staticmethod
+    async def fetch_url() -> str:
+        data = await aio_get(Dog.ENDPOINT)
+        return json.loads(data)['url']
+
     @lightbulb.invoke
     async def invoke(self, ctx: lightbulb.Context):
-        data = await aio_get(self.ENDPOINT)
-        await ctx.respond(as_embed(json.loads(data)['url']))
+        await ctx.respond(as_embed(await dog_urls.get()))
+
+
+# Random images can't be cached, but they can be fetched before they're asked for.
+cat_urls = PrefetchBuffer(Cat.fetch_url, size=5)
+dog_urls = PrefetchBuffer(Dog.fetch_url, size=5)
 
 
 @tools.command
@@ -218,8 +233,8 @@ class Choose(
 
         user.last_choices_list = choices
         user.last_choice = choice
-        user.last_dailies_time = utcnow()
-        await user.asave()
+        user.last_choice_time = utcnow()
+        await user.asave(update_fields=["last_choices_list", "last_choice", "last_choice_time"])
         await ctx.respond(choice)
 
 
@@ -234,13 +249,13 @@ class Stopwatch(
     async def invoke(self, ctx: lightbulb.Context, user: User, locale: Locale):
         if user.stopwatch is None:
             user.stopwatch = utcnow()
-            await user.asave()
+            await user.asave(update_fields=["stopwatch"])
             time = user.stopwatch.astimezone(zoneinfo.ZoneInfo(locale.timezone))
             await ctx.respond(f"Started at **{time.strftime('%-I:%M:%S.%f')}.")
         else:
             elapsed = utcnow() - user.stopwatch
             user.stopwatch = None
-            await user.asave()
+            await user.asave(update_fields=["stopwatch"])
             await ctx.respond(f"Stopped at **{elapsed}**.")
 
 
@@ -1,10 +1,12 @@
 import hikari
 import io
 import lightbulb
-import pandas
-import plotly.express as px
 from ...lib.ctx import DelayedResponse
 from ...lib.dice import Interpreter, InterpreterException, dynamic_round
+from ...lib.imports import lazy_import
+
+pandas = lazy_import("pandas")
+px = lazy_import("plotly.express")
 
 dice = lightbulb.Group("dice", "Commands related to dice rolling and probability.")
 
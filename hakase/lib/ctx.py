@@ -25,12 +25,15 @@ import io
 import lightbulb
 import miru
 import re
-import plotly.figure_factory as figure_factory
 import typing as t
 
+from .imports import lazy_import
 from .utils import utcnow
 
 
+figure_factory = lazy_import("plotly.figure_factory")
+
+
 def as_embed(url, **kwargs) -> hikari.Embed:
     embed = hikari.Embed(**kwargs)
     embed.set_image(url)
@@ -13,6 +13,8 @@ import asyncio
 import hikari
 import typing as t
 
+from .metrics import daemon_duration
+
 
 class Daemon:
     ALL = []
@@ -40,7 +42,8 @@ class Daemon:
     
     async def service(self) -> None:
         while True:
-            await self.callback(self.bot, *self.args, **self.kwargs)
+            with daemon_duration.time(self.callback.__name__):
+                await self.callback(self.bot, *self.args, **self.kwargs)
             await asyncio.sleep(self.seconds)
 
 
@@ -35,10 +35,14 @@ import enum
 import functools
 import itertools
 import math
-import numpy
 import random
 import typing as t
 
+from .imports import lazy_import
+
+
+numpy = lazy_import("numpy")
+
 
 WHITESPACE = " \n\t"
 DICE_CHARS = "dD"
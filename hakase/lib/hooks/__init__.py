@@ -3,15 +3,30 @@ Hooks for Lightbulb 3.
 
 Hooks are functions and coroutines which can be added to the execution
 pipeline of a lightbulb command that can alter or interrupt execution.
-All of the functions in here are components of Hakase's permissions system,
+Most of the functions in here are components of Hakase's permissions system,
 as the hooks here are designed to halt execution of a command if the permissions
 state is incorrect.
+
+The metrics hooks time each command for the metrics endpoint.
+The tracing hooks record a trace of each command, and profile a sample of them.
+The injection hook begins the unit of work the ORM injection functions share.
 """
+from .injection import begin_unit_of_work
+from .metrics import start_command_timer, record_command_duration, observe_command_duration
 from .permissions import require_granted, require_not_denied, require_owner
+from .tracing import start_trace, begin_invoke_span, finish_trace, end_trace
 
 
 __all__ = [
+    'begin_unit_of_work',
+    'start_command_timer',
+    'record_command_duration',
+    'observe_command_duration',
     'require_granted',
     'require_not_denied',
-    'require_owner'
+    'require_owner',
+    'start_trace',
+    'begin_invoke_span',
+    'finish_trace',
+    'end_trace'
 ]
\ No newline at end of file
@@ -0,0 +1,8 @@
+import lightbulb
+
+from ..injection.orm import UnitOfWork, current_unit
+
+
+@lightbulb.hook(lightbulb.ExecutionSteps.MAX_CONCURRENCY)
+async def begin_unit_of_work(_: lightbulb.ExecutionPipeline, ctx: lightbulb.Context) -> None:
+    current_unit.set(UnitOfWork(ctx))
@@ -0,0 +1,33 @@
+import lightbulb
+import time
+import typing as t
+
+from ..metrics import command_duration
+
+
+_started: t.Dict[int, float] = {}
+
+
+def node_of(ctx: lightbulb.Context) -> str:
+    """Get the permission node of the command of a context, for use as a label."""
+    try:
+        return ctx.client.app.permissions_root.get_node_from_command(ctx.command).value
+    except Exception:
+        return "unknown"
+
+
+@lightbulb.hook(lightbulb.ExecutionSteps.MAX_CONCURRENCY)
+async def start_command_timer(_: lightbulb.ExecutionPipeline, ctx: lightbulb.Context) -> None:
+    _started[ctx.interaction.id] = time.perf_counter()
+
+
+@lightbulb.hook(lightbulb.ExecutionSteps.POST_INVOKE)
+async def record_command_duration(_: lightbulb.ExecutionPipeline, ctx: lightbulb.Context) -> None:
+    observe_command_duration(ctx, "ok")
+
+
+def observe_command_duration(ctx: lightbulb.Context, outcome: str) -> None:
+    """Record the duration of a command, if it was timed. Called for failed commands by the error handler."""
+    start = _started.pop(ctx.interaction.id, None)
+    if start is not None:
+        command_duration.observe(time.perf_counter() - start, node_of(ctx), outcome)
@@ -1,14 +1,15 @@
 import lightbulb
 
 from ..permissions import eval_allowed, eval_not_denied, AccessIsDenied
-from ...mvc.discord.models import User
+from ..tracing import span
 
 
 async def stage_permissions_objects(ctx):
-    user, _ = await User.objects.aget_or_create(id=ctx.user.id)
-    acl = await user.get_acl(ctx.client.app.permissions_root)
-    node = ctx.client.app.permissions_root.get_node_from_command(ctx.command)
-    return acl, node
+    with span("permissions"):
+        role_ids = ctx.member.role_ids if ctx.member is not None else ()
+        acl = await ctx.client.app.acl_cache.get(ctx.user.id, role_ids)
+        node = ctx.client.app.permissions_root.get_node_from_command(ctx.command)
+        return acl, node
 
 
 @lightbulb.hook(lightbulb.ExecutionSteps.CHECKS)
@@ -0,0 +1,55 @@
+import asyncio
+import lightbulb
+import os
+
+from ...core.conf import Config
+from ...core.log import logger
+from ..tracing import Trace, Profiler, current_trace
+from .metrics import node_of
+
+
+conf = Config.load()
+profiler = Profiler(
+    os.path.join(conf.logs, "profiles"),
+    threshold=conf.telemetry.slow_command_seconds,
+    sample_rate=conf.telemetry.profile_sample_rate
+)
+
+
+@lightbulb.hook(lightbulb.ExecutionSteps.MAX_CONCURRENCY)
+async def start_trace(_: lightbulb.ExecutionPipeline, ctx: lightbulb.Context) -> None:
+    trace = Trace(node_of(ctx))
+    current_trace.set(trace)
+    profiler.start(trace)
+
+
+@lightbulb.hook(lightbulb.ExecutionSteps.PRE_INVOKE)
+async def begin_invoke_span(_: lightbulb.ExecutionPipeline, ctx: lightbulb.Context) -> None:
+    trace = current_trace.get()
+    if trace is not None:
+        trace.begin("invoke")
+
+
+@lightbulb.hook(lightbulb.ExecutionSteps.POST_INVOKE)
+async def finish_trace(_: lightbulb.ExecutionPipeline, ctx: lightbulb.Context) -> None:
+    await end_trace("ok")
+
+
+async def end_trace(outcome: str) -> None:
+    """
+    End the current trace, logging it if it was slow, and writing its profile if it has one.
+
+    Called for failed commands by the error handler.
+    """
+    trace = current_trace.get()
+    if trace is None:
+        return
+    current_trace.set(None)
+
+    trace.finish()
+    profile = profiler.stop(trace)
+    if trace.duration >= profiler.threshold:
+        logger.warning(f"Slow command ({outcome}): {trace.summary()}")
+    if profile is not None:
+        path = await asyncio.to_thread(profiler.dump, trace, profile)
+        logger.warning(f"Profile of {trace.name} written to {path}.")
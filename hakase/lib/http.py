@@ -0,0 +1,354 @@
+"""Module defining the shared outbound HTTP client
+
+Every outbound HTTP request the bot makes, (outside of the Discord API, which
+hikari handles itself) goes through a single client with a single connection
+pool. This means connections are kept alive and reused, rather than paying
+for a new TCP and TLS handshake on every request.
+
+Responses may optionally be cached, in which case stale entries are
+revalidated with a conditional request, (ETag/If-Modified-Since) and
+concurrent identical requests share a single in-flight fetch.
+
+    * CachedResponse - Class representing a cached response body and its validators
+    * HTTPClient - Class wrapping a pooled aiohttp session
+    * PrefetchBuffer - Class keeping a number of results of a coroutine ready ahead of time
+    * client - The process-wide HTTP client
+"""
+import aiohttp
+import asyncio
+import collections
+import orjson as json
+import time
+import typing as t
+
+from ..core.conf import Config
+from ..core.log import logger
+from .metrics import cache_requests
+
+
+conf: Config = Config.load()
+
+
+class CachedResponse:
+    """
+    A cached response body, along with the validators needed to revalidate it.
+
+    Attributes
+    ----------
+    body : bytes
+        The raw body of the response.
+    expires : float
+        The monotonic time after which the response must be revalidated.
+    etag : str, optional
+        The ETag header of the response, if any.
+    last_modified : str, optional
+        The Last-Modified header of the response, if any.
+    """
+    __slots__ = ("body", "expires", "etag", "last_modified")
+
+    def __init__(self, body: bytes, expires: float, etag: t.Optional[str]=None, last_modified: t.Optional[str]=None):
+        self.body: bytes = body
+        self.expires: float = expires
+        self.etag: t.Optional[str] = etag
+        self.last_modified: t.Optional[str] = last_modified
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.expires > time.monotonic()
+
+    @property
+    def validators(self) -> t.Dict[str, str]:
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HTTPClient:
+    """
+    A pooled, keep-alive HTTP client.
+
+    The underlying aiohttp session is created lazily on first use, since it
+    must be created from within the running event loop. It is closed when
+    the bot stops.
+
+    Caching is opt-in, and only applies to GET requests made with a
+    cache_ttl. Cache keys include the request headers, so responses which
+    depend on an Authorization header are never shared between tokens.
+
+    Parameters
+    ----------
+    pool_size : int
+        The maximum number of simultaneous connections.
+    per_host_limit : int
+        The maximum number of simultaneous connections to a single host.
+    keepalive : float
+        The number of seconds idle connections are kept open for reuse.
+    timeout : float
+        The total number of seconds a request may take.
+
+    Attributes
+    ----------
+    MAX_CACHED : int
+        The number of responses held before expired ones are evicted.
+    """
+    MAX_CACHED = 1000
+
+    def __init__(
+            self,
+            pool_size: int=100,
+            per_host_limit: int=10,
+            keepalive: float=30.0,
+            timeout: float=15.0
+        ):
+        self.pool_size: int = pool_size
+        self.per_host_limit: int = per_host_limit
+        self.keepalive: float = keepalive
+        self.timeout: float = timeout
+        self._session: t.Optional[aiohttp.ClientSession] = None
+        self._cache: t.Dict[tuple, CachedResponse] = {}
+        self._fetches: t.Dict[tuple, asyncio.Future] = {}
+
+        self.requests: int = 0
+        self.errors: int = 0
+        self.in_flight: int = 0
+        self.cache_hits: int = 0
+        self.cache_revalidated: int = 0
+        self.coalesced: int = 0
+        self.connections_opened: int = 0
+        self.connections_reused: int = 0
+
+    @classmethod
+    def from_config(cls, conf: Config) -> t.Self:
+        return cls(
+            pool_size=conf.http.pool_size,
+            per_host_limit=conf.http.per_host_limit,
+            keepalive=conf.http.keepalive_seconds,
+            timeout=conf.http.timeout_seconds
+        )
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.per_host_limit,
+                keepalive_timeout=self.keepalive,
+                ttl_dns_cache=300
+            )
+            # Connection reuse is counted here, rather than read from the
+            # connector's internals, which aren't part of aiohttp's API.
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection_opened)
+            trace.on_connection_reuseconn.append(self._on_connection_reused)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[trace],
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                json_serialize=lambda obj: json.dumps(obj).decode("utf-8")
+            )
+        return self._session
+
+    async def _on_connection_opened(self, *_) -> None:
+        self.connections_opened += 1
+
+    async def _on_connection_reused(self, *_) -> None:
+        self.connections_reused += 1
+
+    async def close(self, *_) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    def decode(body: bytes, format: str) -> t.Union[bytes, str, dict]:
+        if format == "bytes":
+            return body
+        elif format == "text":
+            return body.decode("utf-8")
+        elif format == "json":
+            return json.loads(body)
+        else:
+            raise ValueError(f"Unsupported format '{format}'.")
+
+    async def request(
+            self,
+            method: str,
+            url: str,
+            headers: t.Optional[t.Dict[str, str]]=None,
+            data: t.Optional[dict]=None,
+            format: str="text",
+            valid_responses: t.Optional[t.List[int]]=None,
+            cache_ttl: float=0
+        ) -> t.Union[bytes, str, dict]:
+        """
+        Perform a request, and return its decoded body.
+
+        Parameters
+        ----------
+        valid_responses : t.List[int], optional
+            The response statuses to accept. By default, any 2xx status is accepted.
+        cache_ttl : float
+            If greater than zero, (and the method is GET) the response is cached
+            for this many seconds. Once stale, it is revalidated with a conditional
+            request, and concurrent requests for the same resource are coalesced.
+
+        Raises
+        ------
+        ValueError
+            If the status of the response is not accepted.
+        """
+        if cache_ttl <= 0 or method != "GET":
+            body, _ = await self._request(method, url, headers=headers, data=data, valid_responses=valid_responses)
+            return self.decode(body, format)
+
+        key = (url, tuple(sorted((headers or {}).items())))
+        cached = self._cache.get(key)
+        if cached is not None and cached.is_fresh:
+            self.cache_hits += 1
+            cache_requests.inc("http", "hit")
+            return self.decode(cached.body, format)
+        cache_requests.inc("http", "miss")
+
+        fetch = self._fetches.get(key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._revalidate(key, url, headers, valid_responses, cache_ttl))
+            self._fetches[key] = fetch
+            fetch.add_done_callback(lambda _: self._fetches.pop(key, None))
+        else:
+            self.coalesced += 1
+        return self.decode(await asyncio.shield(fetch), format)
+
+    async def _revalidate(
+            self,
+            key: tuple,
+            url: str,
+            headers: t.Optional[t.Dict[str, str]],
+            valid_responses: t.Optional[t.List[int]],
+            cache_ttl: float
+        ) -> bytes:
+        cached = self._cache.get(key)
+        if cached is not None:
+            headers = {**(headers or {}), **cached.validators}
+
+        body, response = await self._request("GET", url, headers=headers, valid_responses=valid_responses, not_modified=cached is not None)
+        if response.status == 304 and cached is not None:
+            self.cache_revalidated += 1
+            cache_requests.inc("http", "revalidated")
+            cached.expires = time.monotonic() + cache_ttl
+            return cached.body
+
+        if len(self._cache) >= self.MAX_CACHED:
+            self.evict()
+        self._cache[key] = CachedResponse(
+            body,
+            time.monotonic() + cache_ttl,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+        return body
+
+    async def _request(
+            self,
+            method: str,
+            url: str,
+            headers: t.Optional[t.Dict[str, str]]=None,
+            data: t.Optional[dict]=None,
+            valid_responses: t.Optional[t.List[int]]=None,
+            not_modified: bool=False
+        ) -> t.Tuple[bytes, aiohttp.ClientResponse]:
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            async with self.session.request(method, url, headers=headers, data=data) as response:
+                if not self.is_accepted(response.status, valid_responses) and not (not_modified and response.status == 304):
+                    raise ValueError(f"Response code retrieving URL {url} was {response.status}.")
+                body = await response.read()
+        except BaseException:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        return body, response
+
+    @staticmethod
+    def is_accepted(status: int, valid_responses: t.Optional[t.List[int]]=None) -> bool:
+        if valid_responses is None:
+            return 200 <= status < 300
+        return status in valid_responses
+
+    def evict(self) -> None:
+        """Evict expired responses, or every response if none have expired."""
+        for key, cached in list(self._cache.items()):
+            if not cached.is_fresh:
+                self._cache.pop(key, None)
+        if len(self._cache) >= self.MAX_CACHED:
+            self._cache.clear()
+
+    def stats(self) -> t.Dict[str, int]:
+        """Get statistics about the client and its connection pool."""
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'cached': len(self._cache),
+            'cache_hits': self.cache_hits,
+            'cache_revalidated': self.cache_revalidated,
+            'coalesced': self.coalesced,
+            'pool_size': self.pool_size,
+            'per_host_limit': self.per_host_limit,
+            'connections_opened': self.connections_opened,
+            'connections_reused': self.connections_reused
+        }
+
+
+class PrefetchBuffer:
+    """
+    A buffer of results of a coroutine, kept ready ahead of time.
+
+    This is meant for endpoints which return something random on every
+    request, where caching makes no sense, but where the result can just
+    as well be fetched before anyone asks for it. Whenever a result is
+    taken, the buffer is topped back up in the background.
+
+    Parameters
+    ----------
+    fetch : Callable[[], Awaitable]
+        The coroutine function producing a single result.
+    size : int
+        The number of results to keep ready.
+    """
+    def __init__(self, fetch: t.Callable[[], t.Awaitable[t.Any]], size: int=5):
+        self.fetch: t.Callable[[], t.Awaitable[t.Any]] = fetch
+        self.size: int = size
+        self._ready: collections.deque = collections.deque(maxlen=size)
+        self._refill: t.Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._ready)
+
+    async def get(self) -> t.Any:
+        """Take a ready result, or fetch one if the buffer is empty."""
+        try:
+            result = self._ready.popleft()
+        except IndexError:
+            result = await self.fetch()
+        self.refill()
+        return result
+
+    def refill(self) -> None:
+        if self._refill is None or self._refill.done():
+            self._refill = asyncio.create_task(self._fill())
+
+    async def _fill(self) -> None:
+        while len(self._ready) < self.size:
+            try:
+                self._ready.append(await self.fetch())
+            except Exception as e:
+                logger.warning(f"Prefetching failed, buffer holds {len(self._ready)}/{self.size}: {e}")
+                return
+
+
+client: HTTPClient = HTTPClient.from_config(conf)
@@ -0,0 +1,137 @@
+"""Module defining lazy and timed imports
+
+Several dependencies are heavy to import, (pandas, plotly, numpy and friends)
+but are only needed by a handful of rarely used commands. Importing them
+lazily keeps them off the startup path entirely; they are imported the first
+time something is actually accessed on them.
+
+Imports can also be timed, so that whatever is still slow at startup can be
+found without guessing.
+
+    * IMPORT_TIMES - Mapping of module names to the number of seconds their import took
+    * LazyModule - Class standing in for a module until it is first used
+    * lazy_import - Function returning a LazyModule for a module name
+    * timed_imports - Context manager timing every module imported within it
+    * report - Function formatting the slowest entries of a mapping of import times
+"""
+import contextlib
+import importlib
+import importlib.abc
+import sys
+import time
+import typing as t
+
+
+IMPORT_TIMES: t.Dict[str, float] = {}
+
+
+class LazyModule:
+    """
+    A stand-in for a module, which imports it on first attribute access.
+
+    The time the import took is recorded in IMPORT_TIMES.
+
+    Parameters
+    ----------
+    name : str
+        The fully qualified name of the module.
+    """
+    def __init__(self, name: str):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self._name)
+            IMPORT_TIMES.setdefault(self._name, time.perf_counter() - start)
+            self.__dict__['_module'] = module
+        return self._module
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        setattr(self._load(), name, value)
+
+    def __dir__(self) -> t.List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> t.Any:
+    """
+    Get a lazily imported module.
+
+    If the module has already been imported, it is returned as is.
+    """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader: importlib.abc.Loader, name: str, times: t.Dict[str, float]):
+        self._loader = loader
+        self._name = name
+        self._times = times
+
+    def __getattr__(self, name: str) -> t.Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._times[self._name] = time.perf_counter() - start
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, times: t.Dict[str, float]):
+        self._times = times
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name, self._times)
+                return spec
+        return None
+
+
+@contextlib.contextmanager
+def timed_imports() -> t.Iterator[t.Dict[str, float]]:
+    """
+    Time every module imported within this context.
+
+    Times are cumulative, that is, the time of a module includes the
+    time taken to import everything it imports in turn.
+
+    Yields
+    ------
+    t.Dict[str, float]
+        A mapping of module names to the number of seconds their import took,
+        filled in as modules are imported.
+    """
+    times = {}
+    finder = _TimingFinder(times)
+    sys.meta_path.insert(0, finder)
+    try:
+        yield times
+    finally:
+        sys.meta_path.remove(finder)
+        IMPORT_TIMES.update(times)
+
+
+def report(times: t.Dict[str, float], limit: int=10) -> str:
+    """Format the slowest entries of a mapping of import times, in milliseconds."""
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return ", ".join([f"{name} {round(seconds * 1000, 1)}ms" for name, seconds in slowest])
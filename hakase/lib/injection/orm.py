@@ -4,13 +4,72 @@ Injection functions for the ORM.
 These functions are all designed to work with Lightbulb 3's
 DI system. Their purpose is to, given a context, retrieve an object
 from the database associated with that object.
+
+Objects are fetched through a unit of work which lives as long as a
+single invocation, so a command asking for both its user and their
+locale results in one query, not two.
 """
+import asyncio
+import contextvars
 import lightbulb
+import typing as t
 
+from ..tracing import span
 from ...mvc.discord.models import User, Channel, Guild, Locale
 from ...mvc.internal.models import Revision
 
 
+class UnitOfWork:
+    """
+    The objects fetched for a single command invocation.
+
+    Each object is fetched at most once, on first use, and concurrent
+    requests for the same object share the same query. The user is always
+    fetched along with their locale.
+
+    Parameters
+    ----------
+    ctx : lightbulb.Context
+        The context of the invocation.
+    """
+    def __init__(self, ctx: lightbulb.Context):
+        self.interaction_id: int = ctx.interaction.id
+        self.user_id: int = ctx.user.id
+        self.guild_id: t.Optional[int] = ctx.guild_id
+        self.channel_id: int = ctx.channel_id
+        self._fetches: t.Dict[str, asyncio.Future] = {}
+
+    async def _fetch(self, name: str, fetch: t.Callable[[], t.Awaitable[t.Any]]) -> t.Any:
+        future = self._fetches.get(name)
+        if future is None:
+            future = self._fetches[name] = asyncio.ensure_future(fetch())
+        return await future
+
+    async def user(self) -> User:
+        return await self._fetch("user", lambda: User.objects.select_related("locale_settings").aget(id=self.user_id))
+
+    async def locale(self) -> Locale:
+        return (await self.user()).locale_settings
+
+    async def guild(self) -> Guild:
+        return await self._fetch("guild", lambda: Guild.objects.aget(id=self.guild_id))
+
+    async def channel(self) -> Channel:
+        return await self._fetch("channel", lambda: Channel.objects.aget(id=self.channel_id))
+
+
+current_unit: contextvars.ContextVar[t.Optional[UnitOfWork]] = contextvars.ContextVar("current_unit", default=None)
+
+
+def unit_of_work(ctx: lightbulb.Context) -> UnitOfWork:
+    """Get the unit of work of an invocation, beginning one if it has none yet."""
+    unit = current_unit.get()
+    if unit is None or unit.interaction_id != ctx.interaction.id:
+        unit = UnitOfWork(ctx)
+        current_unit.set(unit)
+    return unit
+
+
 async def get_user(ctx: lightbulb.Context) -> User:
     """
     Resolve the author of a command into a user from the ORM.
@@ -25,7 +84,8 @@ async def get_user(ctx: lightbulb.Context) -> User:
     mvc.discord.models.User
         The ORM user matching the author of the context.
     """
-    return await User.objects.aget(id=ctx.user.id)
+    with span("di.get_user"):
+        return await unit_of_work(ctx).user()
 
 
 async def get_guild(ctx: lightbulb.Context) -> Guild:
@@ -42,7 +102,8 @@ async def get_guild(ctx: lightbulb.Context) -> Guild:
     mvc.discord.models.Guild
         The ORM guild matching the guild of the context.
     """
-    return await Guild.objects.aget(id=ctx.guild_id)
+    with span("di.get_guild"):
+        return await unit_of_work(ctx).guild()
 
 
 async def get_channel(ctx: lightbulb.Context) -> Channel:
@@ -59,7 +120,8 @@ async def get_channel(ctx: lightbulb.Context) -> Channel:
     mvc.discord.models.Channel
         The ORM channel matching the channel of the context.
     """
-    return await Channel.objects.aget(id=ctx.channel_id)
+    with span("di.get_channel"):
+        return await unit_of_work(ctx).channel()
 
 
 async def get_revision(ctx: lightbulb.Context) -> Revision:
@@ -76,7 +138,8 @@ async def get_revision(ctx: lightbulb.Context) -> Revision:
     mvc.internal.models.Revision
         The bot's latest revision.
     """
-    return await Revision.objects.alatest()
+    with span("di.get_revision"):
+        return await Revision.objects.alatest()
 
 
 async def get_locale(ctx: lightbulb.Context) -> Locale:
@@ -93,6 +156,6 @@ async def get_locale(ctx: lightbulb.Context) -> Locale:
     mvc.discord.models.Locale
         The locale of the user who ran the command.
     """
-    user = await User.objects.select_related("locale_settings").aget(id=ctx.user.id)
-    return user.locale_settings
+    with span("di.get_locale"):
+        return await unit_of_work(ctx).locale()
 
@@ -0,0 +1,293 @@
+"""Module defining the file manifest
+
+Computing the current revision used to mean reading and hashing every code
+file in the bot's root directory. The manifest remembers the size, mtime,
+digest and line and character counts of every code file, so that only files
+which actually changed need to be read again. It is persisted to disk so that
+this holds across restarts, and kept in memory so that it holds across
+reconnects.
+
+The digest of the whole tree is computed Merkle-style from the digests of
+the individual files, so it never requires reading any file twice. Files
+which do need to be read are hashed in a thread pool; hashlib releases the
+GIL while hashing, so a full rescan is bound by the disk, not the interpreter.
+
+    * ManifestEntry - Class representing a single code file in the manifest
+    * Manifest - Class representing the manifest of an entire directory tree
+    * hash_file - Function reading a file in chunks, returning its digest, line count and character count
+"""
+import asyncio
+import concurrent.futures
+import hashlib
+import orjson as json
+import os
+import typing as t
+
+from ..core.log import logger
+
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str) -> t.Tuple[str, int, int]:
+    """
+    Read a file in chunks, returning its SHA512 hex digest, lines and characters.
+
+    Trailing newlines are not counted as lines, so a file containing
+    'a\\nb\\n\\n' has two lines.
+    """
+    hash = hashlib.sha512()
+    newlines = 0
+    trailing = 0
+    chars = 0
+    with open(path, "rb", buffering=0) as file:
+        while chunk := file.read(CHUNK_SIZE):
+            hash.update(chunk)
+            chars += len(chunk)
+            newlines += chunk.count(b"\n")
+            stripped = chunk.rstrip(b"\n")
+            trailing = trailing + len(chunk) if not stripped else len(chunk) - len(stripped)
+    lines = newlines - trailing + 1 if chars > trailing else 0
+    return hash.hexdigest(), lines, chars
+
+
+class ManifestEntry:
+    """
+    A single code file in the manifest.
+
+    Attributes
+    ----------
+    size : int
+        The size of the file in bytes.
+    mtime_ns : int
+        The modification time of the file in nanoseconds.
+    digest : str
+        The SHA512 hex digest of the file's contents.
+    lines : int
+        The number of lines in the file.
+    chars : int
+        The number of characters (bytes) in the file.
+    """
+    __slots__ = ("size", "mtime_ns", "digest", "lines", "chars")
+
+    def __init__(self, size: int, mtime_ns: int, digest: str, lines: int, chars: int):
+        self.size: int = size
+        self.mtime_ns: int = mtime_ns
+        self.digest: str = digest
+        self.lines: int = lines
+        self.chars: int = chars
+
+    @classmethod
+    def from_file(cls, path: str, stat: os.stat_result) -> t.Self:
+        return cls(stat.st_size, stat.st_mtime_ns, *hash_file(path))
+
+    def matches(self, stat: os.stat_result) -> bool:
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+    def dump(self) -> list:
+        return [self.size, self.mtime_ns, self.digest, self.lines, self.chars]
+
+
+class Manifest:
+    """
+    The manifest of an entire directory tree.
+
+    Only files with one of the given extensions are hashed and counted,
+    but the size of every file in the tree is totalled.
+
+    Parameters
+    ----------
+    root : str
+        The root of the tree.
+    extensions : t.List[str]
+        The extensions of the files which are considered code.
+    exclude : t.List[str]
+        Relative paths of directories which are not walked at all. A directory
+        is excluded if its path ends in any of these, so 'migrations' excludes
+        every migrations folder, while 'static/admin' only excludes admin
+        folders under static.
+    path : str
+        The path of the file the manifest is persisted in.
+
+    Attributes
+    ----------
+    VERSION : int
+        The version of the persisted format. Manifests of any other version
+        are discarded when loaded.
+    MAX_WORKERS : int
+        The maximum number of threads used to hash files.
+    entries : t.Dict[str, ManifestEntry]
+        The code files in the tree, keyed by their path relative to root.
+    files : int
+        The number of files in the tree, as of the last scan.
+    size : int
+        The total size in bytes of the files in the tree, as of the last scan.
+    """
+    VERSION = 1
+    MAX_WORKERS = 8
+
+    def __init__(self, root: str, extensions: t.List[str], exclude: t.List[str], path: str):
+        self.root: str = root
+        self.extensions: t.Tuple[str, ...] = tuple(extensions)
+        self.exclude: t.List[str] = [f"/{folder.strip('/')}/" for folder in exclude]
+        self.path: str = path
+        self.entries: t.Dict[str, ManifestEntry] = {}
+        self.files: int = 0
+        self.size: int = 0
+        self._digest: t.Optional[str] = None
+        self._loaded: bool = False
+
+    @property
+    def lines(self) -> int:
+        return sum([entry.lines for entry in self.entries.values()])
+
+    @property
+    def chars(self) -> int:
+        return sum([entry.chars for entry in self.entries.values()])
+
+    @property
+    def digest(self) -> str:
+        """The Merkle-style digest of the tree, computed from sorted (path, digest) pairs."""
+        if self._digest is None:
+            hash = hashlib.sha512()
+            for path in sorted(self.entries):
+                hash.update(path.encode("utf-8"))
+                hash.update(b"\0")
+                hash.update(self.entries[path].digest.encode("ascii"))
+                hash.update(b"\n")
+            self._digest = hash.hexdigest()
+        return self._digest
+
+    def snapshot(self) -> t.Dict[str, str]:
+        """Get the digest of every code file, as of the last scan."""
+        return {path: entry.digest for path, entry in self.entries.items()}
+
+    def diff(self, snapshot: t.Dict[str, str]) -> t.Set[str]:
+        """Get the relative paths of the code files which differ from a snapshot, as of the last scan."""
+        current = self.snapshot()
+        return {path for path in current.keys() | snapshot.keys() if current.get(path) != snapshot.get(path)}
+
+    def load(self) -> bool:
+        """Load the persisted manifest, returning whether or not one was usable."""
+        self._loaded = True
+        try:
+            with open(self.path, "rb") as file:
+                data = json.loads(file.read())
+        except FileNotFoundError:
+            return False
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Discarding unreadable manifest {self.path}: {e}")
+            return False
+
+        if data.get("version") != self.VERSION or data.get("root") != self.root:
+            return False
+
+        self.entries = {path: ManifestEntry(*entry) for path, entry in data['entries'].items()}
+        self._digest = None
+        return True
+
+    def save(self) -> None:
+        data = {
+            'version': self.VERSION,
+            'root': self.root,
+            'entries': {path: entry.dump() for path, entry in self.entries.items()}
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as file:
+            file.write(json.dumps(data))
+        os.replace(tmp, self.path)
+
+    def is_excluded(self, relpath: str) -> bool:
+        relpath = f"/{relpath}/"
+        return any([relpath.endswith(folder) for folder in self.exclude])
+
+    def walk(self) -> t.Iterator[t.Tuple[str, os.stat_result]]:
+        """Walk the tree, yielding the relative path and stat of every file, without entering excluded directories."""
+        stack = [""]
+        while stack:
+            reldir = stack.pop()
+            try:
+                with os.scandir(os.path.join(self.root, reldir)) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+
+            for entry in entries:
+                relpath = os.path.join(reldir, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not self.is_excluded(relpath):
+                            stack.append(relpath)
+                    elif os.path.join(self.root, relpath) != self.path:
+                        yield relpath, entry.stat()
+                except OSError:
+                    continue
+
+    def _stat(self) -> t.Tuple[int, int, t.Set[str], t.List[t.Tuple[str, os.stat_result]]]:
+        files = 0
+        size = 0
+        seen = set()
+        stale = []
+        for relpath, stat in self.walk():
+            files += 1
+            size += stat.st_size
+            if relpath.endswith(self.extensions):
+                seen.add(relpath)
+                entry = self.entries.get(relpath)
+                if entry is None or not entry.matches(stat):
+                    stale.append((relpath, stat))
+        return files, size, seen, stale
+
+    async def _hash(self, stale: t.List[t.Tuple[str, os.stat_result]]) -> t.List[t.Union[ManifestEntry, OSError]]:
+        loop = asyncio.get_running_loop()
+        workers = max(1, min(self.MAX_WORKERS, os.cpu_count() or 1, len(stale)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="manifest") as pool:
+            return await asyncio.gather(
+                *[loop.run_in_executor(pool, ManifestEntry.from_file, os.path.join(self.root, relpath), stat) for relpath, stat in stale],
+                return_exceptions=True
+            )
+
+    async def scan(self) -> t.Set[str]:
+        """
+        Bring the manifest up to date with the tree.
+
+        The tree is walked in a worker thread, and only files whose size or
+        mtime changed are read, in a thread pool. Results are merged in path
+        order, so the outcome doesn't depend on which file finishes first.
+        The manifest is persisted if anything changed.
+
+        Returns
+        -------
+        t.Set[str]
+            The relative paths of the code files which were added, changed or removed.
+        """
+        if not self._loaded:
+            await asyncio.to_thread(self.load)
+
+        files, size, seen, stale = await asyncio.to_thread(self._stat)
+
+        changed = set(self.entries) - seen
+        for relpath in changed:
+            self.entries.pop(relpath)
+
+        stale.sort(key=lambda item: item[0])
+        results = await self._hash(stale) if stale else []
+        for (relpath, _), entry in zip(stale, results):
+            if isinstance(entry, OSError):
+                continue
+            elif isinstance(entry, BaseException):
+                raise entry
+            old = self.entries.get(relpath)
+            if old is None or old.digest != entry.digest:
+                changed.add(relpath)
+            self.entries[relpath] = entry
+
+        self.files = files
+        self.size = size
+        if changed or stale:
+            self._digest = None
+            try:
+                await asyncio.to_thread(self.save)
+            except OSError as e:
+                logger.warning(f"Unable to persist manifest {self.path}: {e}")
+        return changed
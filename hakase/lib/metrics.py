@@ -0,0 +1,323 @@
+"""Module defining runtime metrics
+
+Metrics are kept in memory in a single registry, and rendered in the
+Prometheus text exposition format by the internal HTTP daemon. Updates are
+on the hot path of nearly everything, so they take no locks. Most happen on
+the event loop, but database queries are timed on whichever thread ran them,
+so counters and histograms keep a shard of values per thread. A thread only
+ever writes to its own shard, and the shards are summed when rendering.
+
+    * Counter - Class defining a monotonically increasing metric
+    * Gauge - Class defining a metric which can go up and down, or be computed on demand
+    * Histogram - Class defining a metric which tracks the distribution of observed values
+    * Registry - Class holding every metric, and rendering them
+    * registry - The process-wide metrics registry
+    * instrument_database - Function timing every database query
+    * instrument_gateway - Function counting every gateway event by type
+    * instrument_rest - Function timing every Discord REST request by route
+"""
+import abc
+import bisect
+import threading
+import time
+import typing as t
+
+from .tracing import span
+
+
+Labels = t.Tuple[str, ...]
+
+
+def _format_labels(names: t.Tuple[str, ...], values: Labels, extra: str="") -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(abc.ABC):
+    TYPE = "untyped"
+
+    def __init__(self, name: str, help: str, labels: t.Tuple[str, ...]=()):
+        self.name: str = name
+        self.help: str = help
+        self.labels: t.Tuple[str, ...] = tuple(labels)
+        self._shards: t.Dict[int, dict] = {}
+
+    def _shard(self) -> dict:
+        """Get the values written by the current thread."""
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards.setdefault(ident, {})
+        return shard
+
+    def header(self) -> t.List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.TYPE}"]
+
+    @abc.abstractmethod
+    def render(self) -> t.List[str]:
+        """Render the values of the metric as lines of the exposition format."""
+
+
+class Counter(_Metric):
+    """A monotonically increasing metric."""
+    TYPE = "counter"
+
+    def inc(self, *labels: str, amount: float=1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> t.Dict[Labels, float]:
+        """Sum the values of every thread."""
+        values = {}
+        for shard in list(self._shards.values()):
+            for labels, value in list(shard.items()):
+                values[labels] = values.get(labels, 0) + value
+        return values
+
+    def get(self, *labels: str) -> float:
+        return self.values().get(labels, 0)
+
+    def render(self) -> t.List[str]:
+        return [f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}" for labels, value in self.values().items()]
+
+
+class Gauge(_Metric):
+    """
+    A metric which can go up and down.
+
+    Instead of being set, a gauge may be given a function, in which case
+    it is computed whenever the metrics are rendered. Gauges are only set
+    from the event loop, so they have no shards; the last value set wins.
+    """
+    TYPE = "gauge"
+
+    def __init__(self, name: str, help: str, labels: t.Tuple[str, ...]=()):
+        super().__init__(name, help, labels)
+        self._values: t.Dict[Labels, float] = {}
+        self._function: t.Optional[t.Callable[[], float]] = None
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def set_function(self, function: t.Callable[[], float]) -> None:
+        self._function = function
+
+    def render(self) -> t.List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        return [f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}" for labels, value in list(self._values.items())]
+
+
+class Histogram(_Metric):
+    """
+    A metric tracking the distribution of observed values.
+
+    Parameters
+    ----------
+    buckets : t.Tuple[float, ...]
+        The upper bounds of the buckets, in ascending order.
+    """
+    TYPE = "histogram"
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name: str, help: str, labels: t.Tuple[str, ...]=(), buckets: t.Tuple[float, ...]=BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets: t.Tuple[float, ...] = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        # Per label set: a count per bucket, (plus one for +Inf) then the sum.
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = [0] * (len(self.buckets) + 2)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def values(self) -> t.Dict[Labels, t.List[float]]:
+        """Sum the values of every thread."""
+        merged = {}
+        for shard in list(self._shards.values()):
+            for labels, values in list(shard.items()):
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = list(values)
+                else:
+                    merged[labels] = [a + b for a, b in zip(total, values)]
+        return merged
+
+    def time(self, *labels: str) -> "_Timer":
+        """Get a context manager observing the time spent within it."""
+        return _Timer(self, labels)
+
+    def render(self) -> t.List[str]:
+        lines = []
+        for labels, values in self.values().items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), values):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: Histogram, labels: Labels):
+        self.histogram: Histogram = histogram
+        self.labels: Labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+
+class Registry:
+    """A collection of metrics, rendered together."""
+    def __init__(self):
+        self.metrics: t.Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls: t.Type[_Metric], name: str, *args, **kwargs) -> _Metric:
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric '{name}' is already registered as a {metric.TYPE}.")
+        return metric
+
+    def counter(self, name: str, help: str, labels: t.Tuple[str, ...]=()) -> Counter:
+        return self._get_or_create(Counter, name, help, labels)
+
+    def gauge(self, name: str, help: str, labels: t.Tuple[str, ...]=()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labels)
+
+    def histogram(self, name: str, help: str, labels: t.Tuple[str, ...]=(), buckets: t.Tuple[float, ...]=Histogram.BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labels, buckets=buckets)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.header())
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry: Registry = Registry()
+
+command_duration: Histogram = registry.histogram(
+    "hakase_command_duration_seconds",
+    "Time taken to run commands, from the start of the execution pipeline.",
+    labels=("node", "outcome")
+)
+gateway_events: Counter = registry.counter(
+    "hakase_gateway_events_total",
+    "Gateway events received, by event type.",
+    labels=("type",)
+)
+db_query_duration: Histogram = registry.histogram(
+    "hakase_db_query_duration_seconds",
+    "Time taken by database queries, by SQL verb.",
+    labels=("verb",)
+)
+rest_request_duration: Histogram = registry.histogram(
+    "hakase_rest_request_duration_seconds",
+    "Time taken by Discord REST requests, by route and response status.",
+    labels=("route", "status")
+)
+daemon_duration: Histogram = registry.histogram(
+    "hakase_daemon_duration_seconds",
+    "Time taken by each run of a daemon.",
+    labels=("daemon",)
+)
+cache_requests: Counter = registry.counter(
+    "hakase_cache_requests_total",
+    "Cache lookups, by cache and result.",
+    labels=("cache", "result")
+)
+
+
+def _query_timer(execute, sql, params, many, context):
+    verb = sql.lstrip().split(" ", 1)[0].upper() if sql else ""
+    with db_query_duration.time(verb):
+        return execute(sql, params, many, context)
+
+
+def instrument_database() -> None:
+    """Time every query of every database connection, including ones opened later."""
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    def on_connection_created(connection, **kwargs):
+        if _query_timer not in connection.execute_wrappers:
+            connection.execute_wrappers.append(_query_timer)
+
+    connection_created.connect(on_connection_created, dispatch_uid="metrics_query_timer")
+    for connection in connections.all(initialized_only=True):
+        on_connection_created(connection)
+
+
+def instrument_gateway(event_manager) -> None:
+    """
+    Count every gateway event by its raw type.
+
+    This must be called before the bot starts, as shards are given
+    the event consumer when they are created.
+    """
+    consume = event_manager.consume_raw_event
+
+    def consume_raw_event(event_name, shard, payload):
+        gateway_events.inc(event_name)
+        return consume(event_name, shard, payload)
+
+    event_manager.consume_raw_event = consume_raw_event
+
+
+def instrument_rest(rest) -> None:
+    """
+    Time every Discord REST request by route and status. Requests made
+    during a command are also added to its trace.
+
+    Rate limits which hikari waits out internally aren't visible here. A 429
+    is only recorded when one surfaces as an error.
+    """
+    import hikari
+
+    request = rest._request
+
+    async def _request(compiled_route, *args, **kwargs):
+        route = f"{compiled_route.route.method} {compiled_route.route.path_template}"
+        start = time.perf_counter()
+        status = "ok"
+        try:
+            with span(f"rest {route}"):
+                return await request(compiled_route, *args, **kwargs)
+        except hikari.HTTPResponseError as e:
+            status = str(int(e.status))
+            raise
+        except hikari.RateLimitTooLongError:
+            status = "429"
+            raise
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            rest_request_duration.observe(time.perf_counter() - start, route, status)
+
+    rest._request = _request
@@ -34,15 +34,19 @@ their ACL explicitly ALLOWs them to do it.
 
 
 from .node import Node
-from .eval import eval_not_denied, eval_allowed, eval_overall
+from .cache import ACLCache
+from .eval import CompiledACL, compile_acl, eval_not_denied, eval_allowed, eval_overall
 from .errors import PermissionsError, NodeNotFound, AccessIsDenied
 from .state import PermissionState
 
 
 __all__ = [
+    ACLCache,
     eval_allowed,
     eval_not_denied,
     eval_overall,
+    compile_acl,
+    CompiledACL,
     Node,
     PermissionState,
     PermissionsError,
@@ -0,0 +1,179 @@
+"""Module defining the effective ACL cache
+
+Permission hooks run on every single command, so the ACL they check against
+is cached in memory rather than read from the database each time. The ACL
+which applies to a user is their own ACL combined with the ACLs of all of
+their roles, and it is compiled once per user and set of roles.
+
+Entries are invalidated when the database says something changed, that is,
+whenever an ACL's many-to-many relation changes, or a permissions object is
+saved or deleted. Member role updates from the gateway drop that member's
+compiled ACLs. ORM signals arrive on the ORM's thread, so invalidations are
+handed over to the event loop, which is the only thing touching the cache.
+
+    * ACLCache - Class caching compiled effective ACLs
+"""
+import asyncio
+import hikari
+import typing as t
+
+from .eval import CompiledACL
+from ..metrics import cache_requests
+from .state import PermissionState
+from ..utils import call_on_loop
+
+
+Entries = t.List[t.Tuple[str, PermissionState]]
+
+
+class ACLCache:
+    """
+    Cache of compiled effective ACLs.
+
+    Attributes
+    ----------
+    MAX_COMPILED : int
+        The number of compiled ACLs held before the cache starts over.
+    """
+    MAX_COMPILED = 10000
+
+    def __init__(self):
+        self._users: t.Dict[int, Entries] = {}
+        self._roles: t.Dict[int, Entries] = {}
+        self._compiled: t.Dict[t.Tuple[int, t.FrozenSet[int]], CompiledACL] = {}
+        self._generation: int = 0
+        self._loop: t.Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def _state(setting: str) -> PermissionState:
+        return PermissionState.DENY if setting == "-" else PermissionState.ALLOW
+
+    async def get(self, user_id: int, role_ids: t.Iterable[int]=()) -> CompiledACL:
+        """
+        Get the effective ACL of a user with the given roles.
+
+        On a hit, this involves no database queries whatsoever.
+
+        Parameters
+        ----------
+        user_id : int
+            The Discord ID of the user.
+        role_ids : iterable of int
+            The Discord IDs of the roles the user has in the current guild.
+        """
+        self._loop = asyncio.get_running_loop()
+        key = (user_id, frozenset(role_ids))
+        acl = self._compiled.get(key)
+        if acl is not None:
+            cache_requests.inc("acl", "hit")
+            return acl
+        cache_requests.inc("acl", "miss")
+
+        generation = self._generation
+        users = {user_id: self._users[user_id]} if user_id in self._users else await self._fetch_user(user_id)
+        missing = [role_id for role_id in key[1] if role_id not in self._roles]
+        roles = await self._fetch_roles(missing) if missing else {}
+
+        acl = CompiledACL()
+        for node, state in users[user_id]:
+            acl.add(node, state)
+        for role_id in key[1]:
+            for node, state in roles.get(role_id, self._roles.get(role_id, [])):
+                acl.add(node, state)
+
+        # Anything invalidated while we were fetching may be stale, so
+        # it's only stored if nothing has changed since.
+        if generation == self._generation:
+            self._users.update(users)
+            self._roles.update(roles)
+            if len(self._compiled) >= self.MAX_COMPILED:
+                self._compiled.clear()
+            self._compiled[key] = acl
+        return acl
+
+    async def _fetch_user(self, user_id: int) -> t.Dict[int, Entries]:
+        from ...mvc.discord.models import User
+
+        user, _ = await User.objects.aget_or_create(id=user_id)
+        return {user_id: [(obj.node, self._state(obj.setting)) async for obj in user.acl.all()]}
+
+    async def _fetch_roles(self, role_ids: t.List[int]) -> t.Dict[int, Entries]:
+        from ...mvc.discord.models import PermissionsObject
+
+        roles = {role_id: [] for role_id in role_ids}
+        rows = PermissionsObject.objects.filter(role__id__in=role_ids).values_list("role__id", "node", "setting")
+        async for role_id, node, setting in rows:
+            roles[role_id].append((node, self._state(setting)))
+        return roles
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._generation += 1
+        self._users.pop(user_id, None)
+        self.invalidate_member(user_id)
+
+    def invalidate_member(self, user_id: int) -> None:
+        self._generation += 1
+        for key in list(self._compiled):
+            if key[0] == user_id:
+                self._compiled.pop(key, None)
+
+    def invalidate_role(self, role_id: int) -> None:
+        self._generation += 1
+        self._roles.pop(role_id, None)
+        for key in list(self._compiled):
+            if role_id in key[1]:
+                self._compiled.pop(key, None)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._users.clear()
+        self._roles.clear()
+        self._compiled.clear()
+
+    async def handle_member_update(self, event: hikari.MemberUpdateEvent) -> None:
+        self._loop = asyncio.get_running_loop()
+        if event.old_member is None or set(event.old_member.role_ids) != set(event.member.role_ids):
+            self.invalidate_member(event.user_id)
+
+    def _on_user_acl_changed(self, instance, action, reverse, pk_set, **kwargs) -> None:
+        if not action.startswith("post_"):
+            return
+        if not reverse:
+            call_on_loop(self._loop, self.invalidate_user, instance.pk)
+        elif pk_set is None:
+            call_on_loop(self._loop, self.clear)
+        else:
+            for user_id in pk_set:
+                call_on_loop(self._loop, self.invalidate_user, user_id)
+
+    def _on_role_acl_changed(self, instance, action, reverse, pk_set, **kwargs) -> None:
+        if not action.startswith("post_"):
+            return
+        if not reverse:
+            call_on_loop(self._loop, self.invalidate_role, instance.pk)
+        elif pk_set is None:
+            call_on_loop(self._loop, self.clear)
+        else:
+            for role_id in pk_set:
+                call_on_loop(self._loop, self.invalidate_role, role_id)
+
+    def _on_user_deleted(self, instance, **kwargs) -> None:
+        call_on_loop(self._loop, self.invalidate_user, instance.pk)
+
+    def _on_role_deleted(self, instance, **kwargs) -> None:
+        call_on_loop(self._loop, self.invalidate_role, instance.pk)
+
+    def _on_object_changed(self, **kwargs) -> None:
+        call_on_loop(self._loop, self.clear)
+
+    def connect(self) -> None:
+        """Connect the ORM signals which invalidate this cache."""
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+        from ...mvc.discord.models import User, Role, PermissionsObject
+
+        m2m_changed.connect(self._on_user_acl_changed, sender=User.acl.through, dispatch_uid="acl_cache_user_acl")
+        m2m_changed.connect(self._on_role_acl_changed, sender=Role.acl.through, dispatch_uid="acl_cache_role_acl")
+        post_delete.connect(self._on_user_deleted, sender=User, dispatch_uid="acl_cache_user")
+        post_delete.connect(self._on_role_deleted, sender=Role, dispatch_uid="acl_cache_role")
+        post_save.connect(self._on_object_changed, sender=PermissionsObject, dispatch_uid="acl_cache_object_save")
+        post_delete.connect(self._on_object_changed, sender=PermissionsObject, dispatch_uid="acl_cache_object")
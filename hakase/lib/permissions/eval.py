@@ -4,21 +4,91 @@ from .node import Node
 from .state import PermissionState
 
 
-def eval_not_denied(command_node: Node, acl: t.Dict[Node, PermissionState]):
-    for acl_node, state in acl.items():
-        if command_node in acl_node and state == PermissionState.DENY:
-            return False
-    return True
+class _TrieEntry:
+    __slots__ = ("children", "allow", "deny")
 
+    def __init__(self):
+        self.children: t.Dict[str, _TrieEntry] = {}
+        self.allow: bool = False
+        self.deny: bool = False
 
-def eval_allowed(command_node: Node, acl: t.Dict[Node, PermissionState]):
-    for acl_node, state in acl.items():
-        if command_node in acl_node and state == PermissionState.ALLOW:
+
+class CompiledACL:
+    """
+    An ACL compiled into a prefix trie over node path segments.
+
+    An ACL entry applies to its own node, and to every node beneath it. So
+    checking a command only requires walking the trie along the segments
+    of the command's node, which costs O(depth) regardless of the size of
+    the ACL.
+
+    Parameters
+    ----------
+    acl : dict of Node or str to PermissionState, optional
+        The ACL to compile. Nodes may be given as their dotted value.
+    """
+    __slots__ = ("_root",)
+
+    def __init__(self, acl: t.Optional[t.Dict[t.Union[Node, str], PermissionState]]=None):
+        self._root: _TrieEntry = _TrieEntry()
+        for node, state in (acl or {}).items():
+            self.add(node, state)
+
+    def add(self, node: t.Union[Node, str], state: PermissionState) -> None:
+        segments = node.segments if isinstance(node, Node) else Node.split(node)
+        entry = self._root
+        for segment in segments:
+            child = entry.children.get(segment)
+            if child is None:
+                child = entry.children[segment] = _TrieEntry()
+            entry = child
+
+        if state == PermissionState.ALLOW:
+            entry.allow = True
+        else:
+            entry.deny = True
+
+    def denies(self, command_node: Node) -> bool:
+        entry = self._root
+        if entry.deny:
             return True
-    return False
+        for segment in command_node.segments:
+            entry = entry.children.get(segment)
+            if entry is None:
+                return False
+            if entry.deny:
+                return True
+        return False
+
+    def allows(self, command_node: Node) -> bool:
+        entry = self._root
+        if entry.allow:
+            return True
+        for segment in command_node.segments:
+            entry = entry.children.get(segment)
+            if entry is None:
+                return False
+            if entry.allow:
+                return True
+        return False
+
+
+def compile_acl(acl: t.Union[CompiledACL, t.Dict[Node, PermissionState]]) -> CompiledACL:
+    if isinstance(acl, CompiledACL):
+        return acl
+    return CompiledACL(acl)
+
+
+def eval_not_denied(command_node: Node, acl: t.Union[CompiledACL, t.Dict[Node, PermissionState]]):
+    return not compile_acl(acl).denies(command_node)
+
+
+def eval_allowed(command_node: Node, acl: t.Union[CompiledACL, t.Dict[Node, PermissionState]]):
+    return compile_acl(acl).allows(command_node)
 
 
-def eval_overall(command_node: Node, acl: t.Dict[Node, PermissionState]):
+def eval_overall(command_node: Node, acl: t.Union[CompiledACL, t.Dict[Node, PermissionState]]):
+    acl = compile_acl(acl)
     if not eval_not_denied(command_node, acl):
         return False
-    return eval_allowed(command_node, acl)
\ No newline at end of file
+    return eval_allowed(command_node, acl)
@@ -7,8 +7,42 @@ from ...mvc.discord.models.permissions import PermissionsObject
 
 
 class Node(anytree.Node):
+    """
+    A node in the permissions tree.
+
+    The dotted path of a node is computed once when the node is created,
+    both as a string, (value) and as a tuple of path segments. (segments)
+    The root node's value is '*', and its segments are empty.
+
+    Every node in a tree shares the same two indices, one mapping node
+    values to nodes, and another mapping lightbulb commands and groups to
+    nodes. This makes lookups constant time regardless of the tree's size.
+    """
     _root = None
 
+    def __init__(self, name, parent=None, **kwargs):
+        super().__init__(name, parent=parent, **kwargs)
+        if parent is None:
+            self.segments = ()
+            self.value = "*"
+            self._index = {}
+            self._commands = {}
+        else:
+            self.segments = parent.segments + (name,)
+            self.value = f"{parent.value}.{name}"
+            self._index = parent._index
+            self._commands = parent._commands
+        self._index[self.value] = self
+
+    @staticmethod
+    def split(value):
+        """Split a dotted node path like '*.admin.bot' into its segments."""
+        if value == "*":
+            return ()
+        if value.startswith("*."):
+            value = value[2:]
+        return tuple(value.split("."))
+
     @classmethod
     def build_from_client(
         cls,
@@ -28,6 +62,7 @@ class Node(anytree.Node):
     @classmethod
     def build_from_group(cls, parent, group):
         node = cls(group.name, parent=parent)
+        node._commands[group] = node
 
         for command in group._commands.values():
            if isinstance(command, lightbulb.SubGroup):
@@ -39,16 +74,12 @@ class Node(anytree.Node):
     
     @classmethod
     def build_from_command(cls, parent, command):
-        return cls(command._command_data.name.lower().replace(" ", "_"), parent=parent)
+        node = cls(command._command_data.name.lower().replace(" ", "_"), parent=parent)
+        node._commands[command] = node
+        return node
     
     def __repr__(self):
-        if self.parent is not None:
-            return f"{self.parent}.{self.name}"
-        return "*"
-
-    @property
-    def value(self):
-        return self.__repr__()
+        return self.value
 
     @property
     def root(self):
@@ -57,12 +88,21 @@ class Node(anytree.Node):
         return self.__class__._root
     
     def __contains__(self, other):
-        return self.value in other.value
+        return other.segments[:len(self.segments)] == self.segments
 
     def render(self):
         return anytree.RenderTree(self)
     
     def get_node_from_command(self, command):
+        try:
+            return self._commands[command if isinstance(command, type) else type(command)]
+        except (KeyError, TypeError):
+            pass
+        try:
+            return self._commands[command]
+        except (KeyError, TypeError):
+            pass
+
         node = command._command_data.name.replace(" ", "_").lower()
         if command._command_data.parent is not None:
             node = self.get_node_from_command(command._command_data.parent).value + "." + node
@@ -72,18 +112,10 @@ class Node(anytree.Node):
         
     
     def get_node(self, name):
-        if name == "*":
-            return self.root
-
-        for node in self.children:
-            if name == node.value:
-                return node
-            elif name.startswith(node.value):
-                try:
-                    return node.get_node(name)
-                except NodeNotFound:
-                    pass
-        raise NodeNotFound
+        try:
+            return self._index[name]
+        except KeyError:
+            raise NodeNotFound
     
     async def get_obj(self, state: PermissionState):
         setting = "+" if state == PermissionState.ALLOW else "-"
@@ -91,18 +123,25 @@ class Node(anytree.Node):
         return obj
 
     async def ensure_objects(self):
-        await self.get_obj(PermissionState.ALLOW)
-        await self.get_obj(PermissionState.DENY)
-        
-        for child in self.children:
-            await child.ensure_objects()
+        """
+        Ensure an ALLOW and a DENY object exist for this node and its descendants.
+
+        Objects which already exist are left alone, so this amounts to a
+        single bulk insert regardless of the size of the tree.
+        """
+        await PermissionsObject.objects.abulk_create(
+            [
+                PermissionsObject(node=node.value, setting=state.value)
+                for node in anytree.PreOrderIter(self)
+                for state in PermissionState
+            ],
+            ignore_conflicts=True
+        )
     
     async def delete_unused(self):
-        async for node in PermissionsObject.objects.all():
-            try:
-                self.get_node(node.node)
-            except NodeNotFound:
-                await node.adelete()
+        """Delete every permissions object whose node is not in this tree."""
+        values = [node.value for node in anytree.PreOrderIter(self)]
+        await PermissionsObject.objects.exclude(node__in=values).adelete()
 
             
 
@@ -0,0 +1,182 @@
+"""Module defining command tracing and profiling
+
+Every command invocation gets a trace, which records how long each part
+of it took: permission checks, dependency injection, the invocation
+itself, and every Discord REST request made along the way. The trace
+follows the invocation through a ContextVar, so anything can add spans
+to it without being handed it.
+
+A sampled fraction of invocations are also profiled. If such an
+invocation turns out to be slow, its profile is written to disk, so that
+slow commands can be diagnosed from production.
+
+    * Span - Class representing a single timed part of a trace
+    * Trace - Class representing the timings of a single command invocation
+    * current_trace - ContextVar holding the trace of the running invocation, if any
+    * span - Context manager adding a span to the current trace, if any
+    * Profiler - Class sampling invocations with cProfile, keeping the profiles of slow ones
+"""
+import contextlib
+import contextvars
+import cProfile
+import datetime
+import os
+import random
+import time
+import typing as t
+
+from ..core.log import logger
+
+
+class Span:
+    """
+    A single timed part of a trace.
+
+    Attributes
+    ----------
+    name : str
+        What was timed.
+    start : float
+        The time the span started, relative to the start of the trace.
+    end : float, optional
+        The time the span ended, relative to the start of the trace.
+    """
+    __slots__ = ("name", "start", "end")
+
+    def __init__(self, name: str, start: float):
+        self.name: str = name
+        self.start: float = start
+        self.end: t.Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+
+class Trace:
+    """
+    The timings of a single command invocation.
+
+    Parameters
+    ----------
+    name : str
+        The name of what's being traced, usually the command's permission node.
+    """
+    def __init__(self, name: str):
+        self.name: str = name
+        self.spans: t.List[Span] = []
+        self.profile: t.Optional[cProfile.Profile] = None
+        self._start: float = time.perf_counter()
+        self._end: t.Optional[float] = None
+
+    def now(self) -> float:
+        return time.perf_counter() - self._start
+
+    def begin(self, name: str) -> Span:
+        span = Span(name, self.now())
+        self.spans.append(span)
+        return span
+
+    def end(self, span: Span) -> None:
+        span.end = self.now()
+
+    def finish(self) -> None:
+        self._end = self.now()
+        for span in self.spans:
+            if span.end is None:
+                span.end = self._end
+
+    @property
+    def duration(self) -> float:
+        return self._end if self._end is not None else self.now()
+
+    def summary(self) -> str:
+        spans = ", ".join([f"{span.name} {round(span.duration * 1000, 1)}ms" for span in self.spans])
+        return f"{self.name} took {round(self.duration * 1000, 1)}ms ({spans})"
+
+
+current_trace: contextvars.ContextVar[t.Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+@contextlib.contextmanager
+def span(name: str) -> t.Iterator[t.Optional[Span]]:
+    """Time the code within this context as a span of the current trace. Does nothing outside of a trace."""
+    trace = current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    span = trace.begin(name)
+    try:
+        yield span
+    finally:
+        trace.end(span)
+
+
+class Profiler:
+    """
+    Samples invocations with cProfile, keeping the profiles of slow ones.
+
+    Only one invocation can be profiled at a time, and since invocations
+    share the event loop, a profile includes whatever else ran on the loop
+    at the same time.
+
+    Parameters
+    ----------
+    directory : str
+        The directory profiles are written to.
+    threshold : float
+        The number of seconds an invocation must take for its profile to be kept.
+    sample_rate : float
+        The fraction of invocations which are profiled. Nothing is profiled by default.
+
+    Attributes
+    ----------
+    MAX_PROFILES : int
+        The number of profiles kept on disk. The oldest are deleted first.
+    """
+    MAX_PROFILES = 50
+
+    def __init__(self, directory: str, threshold: float, sample_rate: float=0.0):
+        self.directory: str = directory
+        self.threshold: float = threshold
+        self.sample_rate: float = sample_rate
+        self._active: t.Optional[Trace] = None
+
+    def start(self, trace: Trace) -> None:
+        if self._active is not None or self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Something else is profiling already.
+            return
+        trace.profile = profile
+        self._active = trace
+
+    def stop(self, trace: Trace) -> t.Optional[cProfile.Profile]:
+        """Stop profiling a trace, returning its profile if it should be kept."""
+        if trace.profile is None:
+            return None
+        trace.profile.disable()
+        if self._active is trace:
+            self._active = None
+        profile, trace.profile = trace.profile, None
+        return profile if trace.duration >= self.threshold else None
+
+    def dump(self, trace: Trace, profile: cProfile.Profile) -> str:
+        """Write a profile to disk, returning its path. This blocks, so it belongs in a thread."""
+        os.makedirs(self.directory, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        name = "".join([char if char.isalnum() else "_" for char in trace.name]).strip("_")
+        path = os.path.join(self.directory, f"{timestamp}_{name}.prof")
+        profile.dump_stats(path)
+
+        profiles = sorted([os.path.join(self.directory, file) for file in os.listdir(self.directory) if file.endswith(".prof")], key=os.path.getmtime)
+        for old in profiles[:-self.MAX_PROFILES]:
+            try:
+                os.remove(old)
+            except OSError as e:
+                logger.warning(f"Unable to remove old profile {old}: {e}")
+        return path
@@ -0,0 +1,113 @@
+"""Module defining directory usage accounting
+
+Totalling the size of a directory means a stat for every file beneath it,
+which for large log or upload directories is far too slow to do on the
+event loop. Instead, sizes are computed in a worker thread, periodically,
+and kept in memory.
+
+Listings are cached per directory, keyed by the directory's mtime, which
+only changes when entries are added, removed or renamed. Unchanged
+directories aren't listed again; only the sizes of their files are
+re-read, which is what picks up appended log files.
+
+    * DirectoryUsage - Class computing and caching the sizes of directories
+    * usage - The process-wide directory usage service
+"""
+import asyncio
+import os
+import threading
+import typing as t
+
+
+class _Listing:
+    __slots__ = ("mtime_ns", "files", "dirs")
+
+    def __init__(self, mtime_ns: int, files: t.Dict[str, int], dirs: t.List[str]):
+        self.mtime_ns: int = mtime_ns
+        self.files: t.Dict[str, int] = files
+        self.dirs: t.List[str] = dirs
+
+
+class DirectoryUsage:
+    """
+    Service computing and caching the sizes of directories.
+
+    Sizes are refreshed by the update_directory_usage daemon, and only
+    computed on demand if they have never been computed at all.
+    """
+    def __init__(self):
+        self._sizes: t.Dict[str, int] = {}
+        self._listings: t.Dict[str, _Listing] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, path: str) -> t.Optional[int]:
+        """Get the last computed size of a directory in bytes, or None if it has never been computed."""
+        try:
+            return self._sizes[os.path.abspath(path)]
+        except KeyError:
+            return None
+
+    async def refresh(self, *paths: str) -> None:
+        """Recompute the sizes of the given directories in a worker thread."""
+        for path in paths:
+            await asyncio.to_thread(self.compute, os.path.abspath(path))
+
+    async def aget(self, path: str) -> int:
+        """Get the size of a directory, computing it first if it has never been computed."""
+        size = self.get(path)
+        if size is None:
+            await self.refresh(path)
+            size = self.get(path)
+        return size
+
+    def compute(self, path: str) -> int:
+        with self._lock:
+            seen = set()
+            size = self._size_of(path, seen)
+            prefix = os.path.join(path, "")
+            for cached in list(self._listings):
+                if (cached == path or cached.startswith(prefix)) and cached not in seen:
+                    self._listings.pop(cached, None)
+            self._sizes[path] = size
+            return size
+
+    def _size_of(self, path: str, seen: t.Set[str]) -> int:
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return 0
+
+        listing = self._listings.get(path)
+        if listing is None or listing.mtime_ns != mtime_ns:
+            listing = self._list(path, mtime_ns)
+        else:
+            for name in listing.files:
+                try:
+                    listing.files[name] = os.lstat(os.path.join(path, name)).st_size
+                except OSError:
+                    listing.files[name] = 0
+
+        seen.add(path)
+        self._listings[path] = listing
+        return sum(listing.files.values()) + sum([self._size_of(subdir, seen) for subdir in listing.dirs])
+
+    @staticmethod
+    def _list(path: str, mtime_ns: int) -> _Listing:
+        files = {}
+        dirs = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            dirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            files[entry.name] = entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return _Listing(mtime_ns, files, dirs)
+
+
+usage: DirectoryUsage = DirectoryUsage()
@@ -3,8 +3,9 @@
 This extension is basically a "miscellaneous" helper function file.
 It largely contains things that don't fit anywhere else.
 
-    * aio_get - Shortcut coroutine to performing an async GET request
+    * aio_get - Shortcut coroutine to performing an async GET request through the shared HTTP client
     * aio_post - Same as above, but with POST instead
+    * call_on_loop - Function calling a callback on an event loop from any thread
     * bearing_to_cardinal - Function which converts a compass bearing to a cardinal direction
     * coord_bearing - Function taking two pairs of coordinates and returning the compass bearing of the line drawn between them
     * coord_convert - Function taking a latitude and longitude and returning it in degree, minute, second format
@@ -26,49 +27,33 @@ It largely contains things that don't fit anywhere else.
 """
 
 import aiofile
-import aiohttp
 import asyncio
 import datetime
 import hikari
 import os
-from PIL import Image
 import hashlib
 import string
 import subprocess
-import geopy.distance
 import math
 import socket
-import tornado
 import typing as t
-import orjson as json
+
+from . import http
+from .imports import lazy_import
+
+
+Image = lazy_import("PIL.Image")
+distance = lazy_import("geopy.distance")
 
 
 async def aio_get(
         url: str, 
         headers: t.Dict[str, str]={}, 
         format: str="text", 
-        valid_responses: t.List[int]=[200]
+        valid_responses: t.Optional[t.List[int]]=None,
+        cache_ttl: float=0
     ) -> t.Union[bytes, str, dict]:
-    client = tornado.httpclient.AsyncHTTPClient()
-    try:
-        request = tornado.httpclient.HTTPRequest(
-            url,
-            headers=headers
-        )
-        response = await client.fetch(request)
-    except tornado.httpclient.HTTPError as e:
-        if e.code not in valid_responses:
-            raise ValueError(f"Response code retrieving URL {url} was {e.code}.")
-        raise
-    
-    if format == "bytes":
-        return response.body
-    elif format == "text":
-        return response.body.decode("utf-8")
-    elif format == "json":
-        return json.loads(response.body.decode("utf-8"))
-    else:
-        raise ValueError(f"Unsupported format '{format}'.")
+    return await http.client.request("GET", url, headers=headers, format=format, valid_responses=valid_responses, cache_ttl=cache_ttl)
 
 
 async def aio_post(
@@ -76,21 +61,31 @@ async def aio_post(
         data: dict={},
         headers: t.Dict[str, str]={},
         format: str="text",
-        valid_responses: t.List[int]=[200]
+        valid_responses: t.Optional[t.List[int]]=None
     ) -> t.Union[bytes, str, dict]:
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, data=data, headers=headers) as response:
-            if response.status not in valid_responses:
-                raise ValueError(f"Response code retrieving URL {url} was {response.status}.")
-            
-            if format == "text":
-                return await response.text()
-            elif format == "json":
-                return await response.json()
-            elif format == "bytes":
-                return await response.read()
-            else:
-                raise ValueError(f"Unsupported format: '{format}'.")
+    return await http.client.request("POST", url, headers=headers, data=data, format=format, valid_responses=valid_responses)
+
+
+def call_on_loop(loop: t.Optional[asyncio.AbstractEventLoop], callback: t.Callable, *args: t.Any) -> None:
+    """
+    Call a callback on an event loop, from any thread.
+
+    ORM signals are sent from whichever thread ran the query, which for the
+    async ORM is never the event loop's. Anything they change which the loop
+    also reads is handed over to the loop instead. If the caller is already
+    on the loop, or the loop isn't running, the callback is called right away.
+    """
+    if loop is None or loop.is_closed() or not loop.is_running():
+        callback(*args)
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        callback(*args)
+    else:
+        loop.call_soon_threadsafe(callback, *args)
 
 
 def bearing_to_cardinal(bearing: float) -> str:
@@ -169,9 +164,9 @@ def coord_distance(
         lat2: float,
         lon2: float
     ) -> float:
-    p1 = geopy.distance.lonlat(*(lon1, lat1))
-    p2 = geopy.distance.lonlat(*(lon2, lat2))
-    return geopy.distance.distance(p1, p2).miles
+    p1 = distance.lonlat(*(lon1, lat1))
+    p2 = distance.lonlat(*(lon2, lat2))
+    return distance.distance(p1, p2).miles
 
 
 def get_dir_size(path: str) -> int:
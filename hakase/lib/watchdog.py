@@ -0,0 +1,94 @@
+"""Module defining the event loop watchdog
+
+Anything which blocks the event loop stalls everything else, the gateway
+heartbeat included. The watchdog measures how late the loop is in running
+a periodic heartbeat, and a sidecar thread watches that heartbeat. When
+the loop stops beating for longer than a threshold, the sidecar captures
+the loop thread's stack, which is exactly the code that's blocking it.
+
+    * LoopWatchdog - Class measuring loop lag and capturing the stacks of blocking calls
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import typing as t
+
+from ..core.log import logger
+from .metrics import registry
+
+
+loop_lag = registry.histogram(
+    "hakase_loop_lag_seconds",
+    "How late the event loop was in running a periodic heartbeat.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+loop_blocked = registry.counter(
+    "hakase_loop_blocked_total",
+    "Times the event loop was blocked for longer than the watchdog threshold."
+)
+
+
+class LoopWatchdog:
+    """
+    Measures event loop lag, and captures the stacks of blocking calls.
+
+    Parameters
+    ----------
+    threshold : float
+        The number of seconds the loop must be blocked for before its
+        stack is captured.
+    interval : float
+        The number of seconds between heartbeats.
+    """
+    def __init__(self, threshold: float=0.25, interval: float=0.1):
+        self.threshold: float = threshold
+        self.interval: float = interval
+        self._beat: float = time.monotonic()
+        self._loop_thread: t.Optional[int] = None
+        self._task: t.Optional[asyncio.Task] = None
+        self._thread: t.Optional[threading.Thread] = None
+        self._stopped: threading.Event = threading.Event()
+        self._stalled: bool = False
+
+    async def start(self, *_) -> None:
+        """Start watching the running event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self, *_) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            loop_lag.observe(lag)
+            if self._stalled:
+                self._stalled = False
+                logger.warning(f"Event loop was blocked for {round(now - self._beat, 3)}s.")
+            self._beat = now
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.interval / 2):
+            blocked = time.monotonic() - self._beat
+            if blocked < self.threshold or self._stalled:
+                continue
+
+            self._stalled = True
+            loop_blocked.inc()
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "(no stack available)\n"
+            logger.warning(f"Event loop blocked for over {round(blocked, 3)}s in:\n{stack.rstrip()}")
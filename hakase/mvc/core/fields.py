@@ -1,9 +1,10 @@
 from django.db import models
-import zoneinfo
+
+from ...core.conf.custom_fields import available_timezones
 
 
 class TimezoneField(models.CharField):
-    CHOICES = list([(tz, tz) for tz in sorted(zoneinfo.available_timezones())])
+    CHOICES = list([(tz, tz) for tz in sorted(available_timezones())])
 
     def __init__(self, *args, **kwargs):
         kwargs['max_length'] = 64
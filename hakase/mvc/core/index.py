@@ -0,0 +1,107 @@
+"""Module defining compiled indexes
+
+Some event handlers run on nearly every gateway event of their kind, and
+only rarely have anything to do. Rather than asking the database whether
+they do each time, they consult an index compiled from the database once,
+and held in memory until a model it was compiled from changes.
+
+    * CompiledIndex - Base class for in-memory indexes invalidated by ORM signals
+"""
+import abc
+import asyncio
+import typing as t
+
+from asgiref.sync import sync_to_async
+
+from ...lib.metrics import cache_requests
+from ...lib.utils import call_on_loop
+
+
+class CompiledIndex(abc.ABC):
+    """
+    An in-memory index compiled from the database.
+
+    The index is compiled on first use, and dropped whenever one of the models
+    it depends upon is saved or deleted, or one of its many-to-many relations
+    changes. It is then compiled again the next time it's used. Concurrent
+    uses while compiling share the same compilation.
+
+    ORM signals are sent from the ORM's thread, so dropping the index is
+    handed over to the event loop, which is the only thing using it.
+
+    Subclasses implement compile(), and set the models they depend upon.
+
+    Parameters
+    ----------
+    name : str
+        The name of the index, used to label its cache metrics.
+
+    Attributes
+    ----------
+    MODELS : t.Tuple[str, ...]
+        The models, as "app_label.ModelName", whose saves and deletes invalidate the index.
+    RELATIONS : t.Tuple[str, ...]
+        The many-to-many relations, as "app_label.ModelName.field", whose changes invalidate the index.
+    """
+    MODELS: t.Tuple[str, ...] = ()
+    RELATIONS: t.Tuple[str, ...] = ()
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self._index: t.Optional[t.Any] = None
+        self._compiling: t.Optional[asyncio.Future] = None
+        self._generation: int = 0
+        self._loop: t.Optional[asyncio.AbstractEventLoop] = None
+
+    @abc.abstractmethod
+    def compile(self) -> t.Any:
+        """Compile the index. This runs synchronously, in the ORM's thread."""
+
+    async def get(self) -> t.Any:
+        """Get the index, compiling it first if need be."""
+        self._loop = asyncio.get_running_loop()
+        if self._index is not None:
+            cache_requests.inc(self.name, "hit")
+            return self._index
+        cache_requests.inc(self.name, "miss")
+
+        if self._compiling is None:
+            self._compiling = asyncio.ensure_future(self._compile())
+        compiling = self._compiling
+        try:
+            return await asyncio.shield(compiling)
+        finally:
+            if self._compiling is compiling and compiling.done():
+                self._compiling = None
+
+    async def _compile(self) -> t.Any:
+        generation = self._generation
+        index = await sync_to_async(self.compile)()
+        # Anything invalidated while compiling may be stale, so the index is
+        # only kept if nothing has changed since. It's still returned though,
+        # as it's no older than the event which asked for it.
+        if generation == self._generation:
+            self._index = index
+        return index
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._index = None
+        self._compiling = None
+
+    def _on_changed(self, **kwargs) -> None:
+        call_on_loop(self._loop, self.invalidate)
+
+    def connect(self) -> None:
+        """Connect the ORM signals which invalidate this index."""
+        from django.apps import apps
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+
+        for label in self.MODELS:
+            model = apps.get_model(label)
+            post_save.connect(self._on_changed, sender=model, weak=False, dispatch_uid=f"{self.name}_{label}_save")
+            post_delete.connect(self._on_changed, sender=model, weak=False, dispatch_uid=f"{self.name}_{label}_delete")
+        for label in self.RELATIONS:
+            model_label, field = label.rsplit(".", 1)
+            through = getattr(apps.get_model(model_label), field).through
+            m2m_changed.connect(self._on_changed, sender=through, weak=False, dispatch_uid=f"{self.name}_{label}")
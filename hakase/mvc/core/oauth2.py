@@ -109,7 +109,8 @@ async def obtain_uid(request):
         'Authorization': f"{request.session['oauth2']['token_type']} {request.session['oauth2']['access_token']}"
     }
 
-    response = await aio_get(f"{ENDPOINT}/users/@me", headers=headers, format="json")
+    # Keyed on the token, so this only saves a round trip when the same session re-authenticates.
+    response = await aio_get(f"{ENDPOINT}/users/@me", headers=headers, format="json", cache_ttl=300)
     request.session['uid'] = int(response['id'])
 
 
@@ -16,7 +16,7 @@ Including another URLconf
 from django.contrib import admin
 from django.views.generic.base import RedirectView
 from django.urls import path, include
-from .views import index
+from .views import index, metrics
 from ...core.conf import Config
 
 
@@ -31,6 +31,7 @@ admin.site.site_header = f"{conf.name} Administration"
 
 urlpatterns = [
     path("", index),
+    path("metrics", metrics),
     path("discord/", include("hakase.mvc.discord.urls")),
     path("admin/", admin.site.urls),
     path('favicon.ico', favicon),
@@ -7,13 +7,14 @@ View Controller.
     * template - Decorator taking a template name as an argument, and automatically returning a rendered request
 """
 
-import zoneinfo
 from django.shortcuts import render
 from django.db.transaction import Atomic
 from asgiref.sync import sync_to_async
 
+from ...core.conf.custom_fields import available_timezones
 
-TIMEZONE_CHOICES = list([(tz, tz) for tz in zoneinfo.available_timezones()])
+
+TIMEZONE_CHOICES = list([(tz, tz) for tz in available_timezones()])
 
 
 def template(template):
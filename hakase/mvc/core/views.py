@@ -1,6 +1,9 @@
 from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse
+import hmac
 
 from ...core.conf import Config
+from ...lib.metrics import registry
 from .utils import template
 
 
@@ -16,4 +19,13 @@ async def index(request):
         'name': request.bot.get_me().username,
         'version': f"v{request.bot.conf.version.number} '{request.bot.conf.version.tag}'",
         'display_admin': authenticated or uid == conf.owner_id
-    }
\ No newline at end of file
+    }
+
+
+async def metrics(request):
+    # The web server is public, so metrics are never served without a token.
+    if not conf.telemetry.enable_metrics or not conf.telemetry.metrics_token:
+        raise Http404
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {conf.telemetry.metrics_token}"):
+        return HttpResponse(status=401)
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,35 +1,46 @@
 from django.db import models
+import abc
 import hikari
 
+from ..role_index import role_index
 
-class BaseIDField(models.BigIntegerField):
+
+class BaseIDField(models.BigIntegerField, metaclass=abc.ABCMeta):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+    async def aresolve(self, bot, id):
+        obj = self.resolve(bot, id)
+        if obj is None:
+            obj = await self.afetch(bot, id)
+        return obj
+
+    @abc.abstractmethod
+    def resolve(self, bot, id):
+        """Get the object an ID refers to from the cache, or None if it isn't cached."""
+
+    @abc.abstractmethod
+    async def afetch(self, bot, id):
+        """Fetch the object an ID refers to over REST."""
+
 
 class UserIDField(BaseIDField):
-    async def aresolve(self, bot, id):
-        user = bot.cache.get_user(id)
-        if user is None:
-            try:
-                user = await bot.rest.fetch_user(id)
-            except hikari.NotFoundError as e:
-                return e
-        return user
+    async def afetch(self, bot, id):
+        try:
+            return await bot.rest.fetch_user(id)
+        except hikari.NotFoundError as e:
+            return e
     
     def resolve(self, bot, id):
         return bot.cache.get_user(id)
 
 
 class GuildIDField(BaseIDField):
-    async def aresolve(self, bot, id):
-        guild = bot.cache.get_guild(id)
-        if guild is None:
-            try:
-                guild = await bot.rest.fetch_guild(id)
-            except hikari.NotFoundError as e:
-                return e
-        return guild
+    async def afetch(self, bot, id):
+        try:
+            return await bot.rest.fetch_guild(id)
+        except hikari.NotFoundError as e:
+            return e
     
     def resolve(self, bot, id):
         if not isinstance(id, int):
@@ -38,14 +49,11 @@ class GuildIDField(BaseIDField):
 
 
 class ChannelIDField(BaseIDField):
-    async def aresolve(self, bot, id):
-        channel = bot.cache.get_guild_channel(id)
-        if channel is None:
-            try:
-                channel = await bot.rest.fetch_channel(id)
-            except hikari.NotFoundError as e:
-                return e
-        return channel
+    async def afetch(self, bot, id):
+        try:
+            return await bot.rest.fetch_channel(id)
+        except hikari.NotFoundError as e:
+            return e
     
     def resolve(self, bot, id):
         if not isinstance(id, int):
@@ -66,16 +74,8 @@ class ChannelTypeField(models.CharField):
 
 
 class RoleIDField(BaseIDField):
-    async def aresolve(self, bot, id):
-        role = bot.cache.get_role(id)
-        if role is None:
-            for _, guild in bot.cache.get_guilds_view().items():
-                roles = await guild.fetch_roles()
-                roles = filter(lambda r: r.id == id, roles)
-                if len(roles) == 0:
-                    raise hikari.NotFoundError(f"The role ID {id} could not be resolved.")
-                role = roles[0]
-        return role
+    async def afetch(self, bot, id):
+        return await role_index.aresolve(bot, id)
     
     def resolve(self, bot, id):
         if not isinstance(id, int):
@@ -2,6 +2,7 @@ import hikari
 import hikari.channels
 
 from .models import User, Guild, Channel, Role
+from .role_index import role_index
 
 
 def handle_events(*event_classes):
@@ -18,6 +19,11 @@ class DiscordEventHandler:
     @staticmethod
     @handle_events(hikari.GuildEvent)
     async def handle_guild_event(event):
+        if isinstance(event, hikari.GuildAvailableEvent) or isinstance(event, hikari.GuildJoinEvent):
+            role_index.add_guild(event.guild_id, event.roles.values())
+        if isinstance(event, hikari.GuildLeaveEvent):
+            role_index.remove_guild(event.guild_id)
+
         if isinstance(event, hikari.GuildJoinEvent) or isinstance(event, hikari.GuildLeaveEvent):
             await DiscordEventHandler.run_model_update(event.app)
     
@@ -36,11 +42,7 @@ class DiscordEventHandler:
     @handle_events(hikari.MemberEvent)
     async def handle_member_event(event):
         if isinstance(event, hikari.MemberCreateEvent):
-            try:
-                await User.objects.aget(id=event.user.id)
-            except User.DoesNotExist:
-                user = User(id=event.user.id)
-                await user.asave()
+            await User.acreate_missing([event.user.id])
             
             guild = await Guild.objects.aget(id=event.guild_id)
             if guild.greeting is not None:
@@ -50,22 +52,62 @@ class DiscordEventHandler:
     @handle_events(hikari.RoleEvent)
     async def handle_role_event(event):
         if isinstance(event, hikari.RoleCreateEvent):
+            role_index.add(event.role)
             guild = await Guild.objects.aget(id=event.guild_id)
             role = Role(id=event.role_id, guild=guild)
             await role.asave()
+        if isinstance(event, hikari.RoleUpdateEvent):
+            role_index.add(event.role)
         if isinstance(event, hikari.RoleDeleteEvent):
+            role_index.remove(event.role_id)
             role = await Role.objects.aget(id=event.role_id)
             await role.adelete()
 
     @staticmethod
-    async def run_model_update(bot):
+    async def prune(bot, model, fetch):
+        """
+        Delete the channels or roles which no longer exist in Discord.
+
+        The table is streamed first, collecting IDs by guild. Only once it has
+        been read is Discord asked what each guild still has, and everything
+        which is gone is then deleted with a single query.
 
-        for _, user in bot.cache.get_users_view().items():
+        Parameters
+        ----------
+        bot : hikari.GatewayBot
+            The bot to make REST requests with.
+        model : t.Type[Channel | Role]
+            The model to prune.
+        fetch : t.Callable
+            A coroutine function returning the current channels or roles of a guild.
+        """
+        name = model.__name__.lower()
+        by_guild = {}
+        async for obj in model.objects.all():
+            by_guild.setdefault(obj.guild_id, []).append(obj.id)
+
+        stale = []
+        for guild_id, ids in by_guild.items():
             try:
-                await User.objects.aget(id=user.id)
-            except User.DoesNotExist:
-                user = User(id=user.id)
-                await user.asave()
+                current = set([obj.id for obj in await fetch(guild_id)])
+            except hikari.errors.NotFoundError:
+                for id in ids:
+                    bot.logger.warning(f"Deleting {name} ID: {id} since its guild is missing.")
+                stale.extend(ids)
+                continue
+
+            for id in ids:
+                if id not in current:
+                    bot.logger.warning(f"Deleting {name} ID: {id} since it can no longer be resolved.")
+                    stale.append(id)
+
+        if stale:
+            await model.objects.filter(id__in=stale).adelete()
+
+    @staticmethod
+    async def run_model_update(bot):
+
+        await User.acreate_missing(bot.cache.get_users_view().keys())
         
         guilds = []
         for _, guild in bot.cache.get_guilds_view().items():
@@ -76,18 +118,18 @@ class DiscordEventHandler:
                 guild = Guild(id=guild.id)
                 await guild.asave()
         
-        async for guild in Guild.objects.all():
+        # Guilds are read up front, so that no cursor is held open across REST requests.
+        missing = []
+        for guild in [guild async for guild in Guild.objects.all()]:
             try:
                 await bot.rest.fetch_guild(guild.id)
             except (hikari.UnauthorizedError, hikari.NotFoundError):
-                async for channel in Channel.objects.filter(guild_id=guild.id):
-                    bot.logger.warning(f"Deleting channel ID: {channel.id} since its guild is missing.")
-                    await channel.adelete()
-                async for role in Role.objects.filter(guild_id=guild.id):
-                    bot.logger.warning(f"Deleting role ID: {role.id} since its guild is missing.")
-                    await role.adelete()
-                bot.logger.warning(f"Deleting Guild ID: {guild.id} since it can no longer be resolved.")
-                await guild.adelete()
+                bot.logger.warning(f"Deleting Guild ID: {guild.id}, along with its channels and roles, since it can no longer be resolved.")
+                missing.append(guild.id)
+        if missing:
+            await Channel.objects.filter(guild_id__in=missing).adelete()
+            await Role.objects.filter(guild_id__in=missing).adelete()
+            await Guild.objects.filter(id__in=missing).adelete()
 
         channels = []
         for _, channel in bot.cache.get_guild_channels_view().items():
@@ -105,25 +147,9 @@ class DiscordEventHandler:
                 channel = Channel(id=channel.id, type=type, guild=guild)
                 await channel.asave()
         
-        guild_channel_mapping = {}
-        async for channel in Channel.objects.all():
-            guild = (await Channel.objects.select_related('guild').aget(id=channel.id)).guild
-            try:
-                if channel.id not in guild_channel_mapping[str(guild.id)]:
-                    bot.logger.warning(f"Deleting channel ID: {channel.id} since it can no longer be resolved.")
-                    await channel.adelete()
-            except KeyError:
-                try:
-                    await bot.rest.fetch_guild(guild.id)
-
-                    guild_channel_mapping[str(guild.id)] = list([c.id for c in (await bot.rest.fetch_guild_channels(guild.id))])
-                    if channel.id not in guild_channel_mapping[str(guild.id)]:
-                        bot.logger.warning(f"Deleting channel ID: {channel.id} since it can no longer be resolved.")
-                        await channel.adelete()
-                except hikari.errors.NotFoundError:
-                    bot.logger.warning(f"Deleting channel ID: {channel.id} since its guild is missing.")
-                    await channel.adelete()                
+        await DiscordEventHandler.prune(bot, Channel, bot.rest.fetch_guild_channels)
         
+        role_index.seed(bot)
         roles = []
         for _, role in bot.cache.get_roles_view().items():
             roles.append(role.id)
@@ -134,24 +160,7 @@ class DiscordEventHandler:
                 role = Role(id=role.id, guild_id=role.guild_id)
                 await role.asave()
         
-        guild_role_mapping = {}
-        async for role in Role.objects.all():
-            guild = (await Role.objects.select_related('guild').aget(id=role.id)).guild
-            try:
-                if role.id not in guild_role_mapping[str(guild.id)]:
-                    bot.logger.warning(f"Deleting role ID: {role.id} since it was not in the cache.")
-                    await role.adelete()
-            except KeyError:
-                try:
-                    await bot.rest.fetch_guild(guild.id)
-                
-                    guild_role_mapping[str(guild.id)] = list([r.id for r in (await bot.rest.fetch_roles(guild.id))])
-                    if role.id not in guild_role_mapping[str(guild.id)]:
-                        bot.logger.warning(f"Deleting role ID: {role.id} since it was not in the cache.")
-                        await role.adelete()
-                except hikari.errors.NotFoundError:
-                    bot.logger.warning(f"Deleting role ID: {role.id} since its guild is missing.")
-                    await role.adelete()
+        await DiscordEventHandler.prune(bot, Role, bot.rest.fetch_roles)
         
         await bot.permissions_root.ensure_objects()
         await bot.permissions_root.delete_unused()
\ No newline at end of file
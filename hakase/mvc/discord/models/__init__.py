@@ -1,4 +1,4 @@
-from .base import DiscordQuerySet, DiscordBaseManager, DiscordBaseModel
+from .base import DiscordQuerySet, DiscordBaseManager, DiscordBaseModel, aresolve_many
 from .user import User
 from .guild import Guild
 from .channel import Channel
@@ -13,6 +13,7 @@ __all__ = [
     'DiscordQuerySet',
     'DiscordBaseManager',
     'DiscordBaseModel',
+    'aresolve_many',
     'User',
     'Guild',
     'Channel',
@@ -4,6 +4,7 @@ from ...core.models import BaseAsyncModel
 from ..fields import BaseIDField
 
 from asgiref.sync import sync_to_async
+import asyncio
 import inspect
 
 
@@ -63,38 +64,154 @@ def qs_inject_bot(func):
     return wrapper
 
 
+async def aresolve_many(objs, bot=None, concurrency=8):
+    """
+    Resolve the Discord ID fields of many objects at once.
+
+    Every ID across all of the objects is first checked against the bot's
+    cache. Whatever is left over is deduplicated, and then fetched over REST
+    concurrently, with no more than `concurrency` requests in flight.
+    Objects which don't exist are stored as the NotFoundError or RoleNotFound
+    their field returned, which only_valid filters out. Any other error is raised.
+
+    Parameters
+    ----------
+    objs : list of DiscordBaseModel
+        The objects to resolve. They may be of mixed types.
+    bot : hikari.GatewayBot, optional
+        The bot to attach to every object before resolving.
+    concurrency : int
+        The maximum number of concurrent REST requests.
+
+    Returns
+    -------
+    list of DiscordBaseModel
+        The same objects which were passed in, now resolved.
+    """
+    misses = {}
+    for obj in objs:
+        if bot is not None:
+            obj.attach_bot(bot)
+
+        for name, field in obj.get_id_fields():
+            id = getattr(obj, field.attname)
+            if id is None:
+                obj._resolved[name] = None
+                continue
+
+            resolved = field.resolve(obj.bot, id)
+            if resolved is not None:
+                obj._resolved[name] = resolved
+            else:
+                key = (field.__class__, id)
+                if key not in misses:
+                    misses[key] = (field, obj.bot, [])
+                misses[key][2].append((obj, name))
+
+    if not misses:
+        return objs
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(field, bot, id):
+        async with semaphore:
+            return await field.afetch(bot, id)
+
+    # Fields return the error for an object which doesn't exist, rather than
+    # raising it. Anything they do raise, (rate limits, outages and the like)
+    # is a real failure, so it propagates rather than being recorded.
+    results = await asyncio.gather(
+        *[fetch(field, bot, id) for (_, id), (field, bot, _) in misses.items()]
+    )
+    for (_, _, targets), result in zip(misses.values(), results):
+        for obj, name in targets:
+            obj._resolved[name] = result
+    return objs
+
+
 class DiscordQuerySet(models.query.QuerySet):
+    CHUNK_SIZE = 500
+
     def __init__(self, *args, **kwargs):
         self._bot = kwargs.pop('bot', None)
         self.only_valid = kwargs.pop('only_valid', [])
         self.resolve = kwargs.pop('resolve', False)
+        self.chunk_size = kwargs.pop('chunk_size', DiscordQuerySet.CHUNK_SIZE)
         super().__init__(*args, **kwargs)
     
+    def _clone(self):
+        clone = super()._clone()
+        clone._bot = self._bot
+        clone.only_valid = self.only_valid
+        clone.resolve = self.resolve
+        clone.chunk_size = self.chunk_size
+        return clone
+
+    def chunked(self, chunk_size):
+        """Return a copy of this queryset which streams in chunks of the given size."""
+        clone = self._chain()
+        clone.chunk_size = chunk_size
+        return clone
+
     def attach_bot_to(self, obj):
         obj._bot = self._bot
         return obj
     
+    def is_valid(self, obj):
+        return not any([isinstance(obj._resolved[field], Exception) for field in self.only_valid])
+
     def __iter__(self):
         self._fetch_all()
         for item in self._result_cache:
             if hasattr(item, "_bot"):
                 item._bot = self._bot
                 if self.resolve is True:
-                    self.item.resolve_all()
+                    item.resolve_all()
             yield item
     
+    async def achunks(self):
+        """
+        Iterate over the results of this queryset in chunks.
+
+        Unless the queryset has already been evaluated, rows are streamed
+        from a server-side cursor, so no more than one chunk is held in
+        memory at a time.
+        """
+        if self._result_cache is not None:
+            for i in range(0, len(self._result_cache), self.chunk_size):
+                yield self._result_cache[i:i + self.chunk_size]
+            return
+
+        chunk = []
+        async for item in self.aiterator(chunk_size=self.chunk_size):
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
     def __aiter__(self):
         async def generator():
-            await sync_to_async(self._fetch_all)()
-            for item in self._result_cache:
-                item = self.attach_bot_to(item)
+            async for chunk in self.achunks():
+                items = [self.attach_bot_to(item) for item in chunk]
                 if self.resolve is True:
-                    await item.resolve_all()
-                    if any([isinstance(item._resolved[field], Exception) for field in self.only_valid]):
+                    await aresolve_many(items)
+
+                for item in items:
+                    if self.resolve is True and not self.is_valid(item):
                         continue
-                yield item
+                    yield item
         return generator()
 
+    async def aresolve_all(self, bot=None):
+        """Fetch the queryset and resolve every object in it in bulk."""
+        if bot is not None:
+            self._bot = bot
+        await sync_to_async(self._fetch_all)()
+        items = [self.attach_bot_to(item) for item in self._result_cache]
+        return await aresolve_many(items)
+
 
 def inject_bot(func):
     def inner(self, *args, **kwargs):
@@ -158,32 +275,33 @@ class DiscordBaseModel(BaseAsyncModel):
     
     def attach_bot(self, bot):
         self._bot = bot
+
+    @classmethod
+    def get_id_fields(cls):
+        """
+        Get the Discord ID fields of this model.
+
+        This is computed once per model class, and then cached on it.
+        Returns a tuple of (name, field) pairs.
+        """
+        id_fields = cls.__dict__.get("_id_fields")
+        if id_fields is None:
+            id_fields = tuple([
+                (field.name, field) for field in cls._meta.concrete_fields
+                if isinstance(field, BaseIDField)
+            ])
+            cls._id_fields = id_fields
+        return id_fields
     
     async def aresolve_all(self, bot=None):
-        if bot is not None:
-            self.attach_bot(bot)
-
-        for name in self._get_field_expression_map(self._meta).keys():
-            if name == "pk":
-                continue
-            field = getattr(self.__class__, name)
-            if isinstance(field, property):
-                continue
-            else:
-                field = field.field
-            if isinstance(field, BaseIDField):
-                self._resolved[name] = await field.aresolve(self.bot, getattr(self, name))
+        await aresolve_many([self], bot=bot)
     
     def resolve_all(self, bot=None):
         if bot is not None:
             self.attach_bot(bot)
         
-        for name in self._get_field_expression_map(self._meta).keys():
-            if name == "pk":
-                continue
-            field = getattr(self.__class__, name).field
-            if isinstance(field, BaseIDField):
-                self._resolved[name] = field.resolve(self.bot, getattr(self, name))
+        for name, field in self.get_id_fields():
+            self._resolved[name] = field.resolve(self.bot, getattr(self, field.attname))
     
     async def aresolve(self, field_name, bot=None):
         if bot is not None:
@@ -1,6 +1,7 @@
 from django.db import models
 from .base import DiscordBaseModel
 from .role import Role
+from ..role_groups import role_groups
 
 
 class RoleGroup(DiscordBaseModel):
@@ -13,35 +14,26 @@ class RoleGroup(DiscordBaseModel):
 
     @classmethod
     async def process_event(cls, event):
-        async for group in cls.objects.all():
-            group = await cls.objects.select_related("header_role").aget(id=group.id)
+        if not event.old_member:
+            return
 
-            async for guild in group.guild.all():
-                if event.guild_id != guild.id:
-                    return
-                break
-            else:
-                return
+        groups = await role_groups.for_guild(event.guild_id)
+        if not groups:
+            return
 
-            if not event.old_member:
-                return
-            
-            old_roles = set(event.old_member.role_ids)
-            new_roles = set(event.member.role_ids)
-            
-            difference = (old_roles - new_roles).union(new_roles - old_roles)
-            if group.header_role.id in difference or not difference:
-                return
+        add, remove = role_groups.assign(groups, event.old_member.role_ids, event.member.role_ids)
+        if not add and not remove:
+            return
 
-            should_possess = False
-            async for role in group.watched_roles.all():
-                if role.id in event.member.role_ids:
-                    should_possess = True
-            
-            if should_possess:
-                if group.header_role.id not in event.member.role_ids:
-                    await event.member.add_role(group.header_role.id)
-            else:
-                if group.header_role.id in event.member.role_ids:
-                    await event.member.remove_role(group.header_role.id)
-        
+        # The role set sent to Discord replaces the member's roles outright, so
+        # it's built from the cached member, which reflects any changes made
+        # since this event, rather than from the event's snapshot. A change
+        # which lands between this read and the edit is still overwritten, and
+        # isn't restored afterwards. Closing that window entirely would take
+        # one add_role or remove_role request per header role instead.
+        member = event.app.cache.get_member(event.guild_id, event.user_id) or event.member
+        current = set(member.role_ids) - {event.guild_id}
+        roles = (current | add) - remove
+        if roles == current:
+            return
+        await event.app.rest.edit_member(event.guild_id, event.user_id, roles=roles)
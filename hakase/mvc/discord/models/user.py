@@ -1,9 +1,11 @@
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
 
 from .base import DiscordBaseModel
 from ..fields import UserIDField
 from ....lib.permissions import PermissionState
 import hikari
+import typing as t
 
 
 class User(DiscordBaseModel):
@@ -39,36 +41,63 @@ class User(DiscordBaseModel):
         return acl 
     
     def save(self, *args, **kwargs):
+        """
+        Save the user, creating their locale settings if they have none.
+
+        A user whose locale is already linked is saved as is, with a single query.
+        Otherwise the locale is created and linked in the same transaction. When
+        the user may already exist, (that is, without force_insert) their row is
+        locked and any locale it already links to is kept, so that a user built
+        from an ID alone doesn't lose their settings.
+        """
+        if self.locale_settings_id is not None:
+            return super().save(*args, **kwargs)
+
         from .locale import Locale
-        o2o_fields = {
-            'locale_settings': Locale
-        }
-        for field, cls in o2o_fields.items():
-            if getattr(self, field) is None:
-                o = cls()
-                o.save()
-                setattr(self, field, o)
-        return super().save(*args, **kwargs)
-    
+        with transaction.atomic():
+            if not kwargs.get("force_insert"):
+                self.locale_settings_id = User.objects.select_for_update().filter(id=self.id).values_list("locale_settings_id", flat=True).first()
+            if self.locale_settings_id is None:
+                self.locale_settings = Locale.objects.create()
+
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "locale_settings" not in update_fields:
+                kwargs["update_fields"] = [*update_fields, "locale_settings"]
+            return super().save(*args, **kwargs)
+
     async def asave(self, *args, **kwargs):
+        return await sync_to_async(self.save)(*args, **kwargs)
+
+    @classmethod
+    def create_missing(cls, ids: t.Iterable[int]) -> int:
+        """
+        Create whichever of the given users don't exist yet, along with their
+        locales. This takes four queries, no matter how many users are created.
+
+        Users created by someone else in the meantime, (a member joining, say)
+        are skipped rather than failing the whole batch, and the locales made
+        for them are deleted again.
+
+        Returns
+        -------
+        int
+            The number of users created.
+        """
         from .locale import Locale
-    
-        o2o_fields = {
-            'locale_settings': Locale
-        }
+        ids = list(ids)
+        with transaction.atomic():
+            existing = set(cls.objects.filter(id__in=ids).values_list("id", flat=True))
+            missing = [id for id in ids if id not in existing]
+            if not missing:
+                return 0
+            locales = Locale.objects.bulk_create([Locale() for _ in missing])
+            cls.objects.bulk_create([cls(id=id, locale_settings=locale) for id, locale in zip(missing, locales)], ignore_conflicts=True)
+            orphaned, _ = Locale.objects.filter(id__in=[locale.id for locale in locales], user__isnull=True).delete()
+            return len(locales) - orphaned
 
-        for field, cls in o2o_fields.items():
-            try:
-                s = await User.objects.select_related(field).aget(id=self.id)
-                if getattr(s, field) is None:
-                    o = cls()
-                    await o.asave()
-                    setattr(self, field, o)
-            except User.DoesNotExist:
-                o = cls()
-                await o.asave()
-                setattr(self, field, o)
-        return await super().asave(*args, **kwargs)
+    @classmethod
+    async def acreate_missing(cls, ids: t.Iterable[int]) -> int:
+        return await sync_to_async(cls.create_missing)(ids)
     
     def __str__(self):
         try:
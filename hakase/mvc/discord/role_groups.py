@@ -0,0 +1,85 @@
+"""Module defining the role group index
+
+Role groups are checked on every member update in every guild. Rather than
+reading every role group from the database each time, the role groups of
+each guild are compiled in memory, as a mapping of header roles to the
+roles they watch.
+
+    * RoleGroupIndex - Class indexing role groups by guild
+    * role_groups - The process-wide role group index
+"""
+import typing as t
+
+from ..core.index import CompiledIndex
+
+
+Groups = t.Dict[int, t.FrozenSet[int]]
+
+
+class RoleGroupIndex(CompiledIndex):
+    """
+    An index of guild IDs to their role groups.
+
+    The role groups of a guild map the ID of each header role to
+    the IDs of the roles it watches. Groups without a header role
+    are left out, since there's nothing to assign.
+    """
+    MODELS = ("discord.RoleGroup",)
+    RELATIONS = ("discord.RoleGroup.watched_roles", "discord.Guild.role_groups")
+
+    def __init__(self):
+        super().__init__("role_groups")
+
+    def compile(self) -> t.Dict[int, Groups]:
+        from django.apps import apps
+
+        RoleGroup = apps.get_model("discord.RoleGroup")
+        Guild = apps.get_model("discord.Guild")
+
+        watched = {}
+        for group_id, role_id in RoleGroup.watched_roles.through.objects.values_list("rolegroup_id", "role_id"):
+            watched.setdefault(group_id, set()).add(role_id)
+
+        headers = dict(RoleGroup.objects.filter(header_role__isnull=False).values_list("id", "header_role_id"))
+        index = {}
+        for guild_id, group_id in Guild.role_groups.through.objects.values_list("guild_id", "rolegroup_id"):
+            if group_id in headers:
+                groups = index.setdefault(guild_id, {})
+                groups[headers[group_id]] = frozenset(watched.get(group_id, ())).union(groups.get(headers[group_id], ()))
+        return index
+
+    async def for_guild(self, guild_id: int) -> Groups:
+        return (await self.get()).get(guild_id, {})
+
+    @staticmethod
+    def assign(groups: Groups, old_role_ids: t.Iterable[int], new_role_ids: t.Iterable[int]) -> t.Tuple[t.Set[int], t.Set[int]]:
+        """
+        Work out the header roles a member should gain and lose after a role change, according to their guild's role groups.
+
+        A member should have a header role if and only if they have any of the
+        roles it watches. Header roles which were themselves just changed are
+        left alone, so that they can still be assigned by hand.
+
+        Returns
+        -------
+        t.Tuple[t.Set[int], t.Set[int]]
+            The IDs of the header roles to add, and the IDs of those to remove.
+        """
+        old, new = set(old_role_ids), set(new_role_ids)
+        changed = old ^ new
+        add, remove = set(), set()
+        if not changed:
+            return add, remove
+
+        for header, watched in groups.items():
+            if header in changed:
+                continue
+            if watched.isdisjoint(new):
+                if header in new:
+                    remove.add(header)
+            elif header not in new:
+                add.add(header)
+        return add, remove
+
+
+role_groups: RoleGroupIndex = RoleGroupIndex()
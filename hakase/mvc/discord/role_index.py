@@ -0,0 +1,137 @@
+"""Module defining the role index
+
+Discord's API offers no way to look up a role by its ID alone; a role can only
+be fetched through the guild it belongs to. The role index keeps track of which
+guild every role belongs to, so that resolving a role which isn't in the cache
+costs at most one REST call, instead of one per guild.
+
+    * RoleNotFound - Error returned when a role ID cannot be resolved
+    * RoleIndex - Class mapping roles to their guilds, and caching guild role lists
+    * role_index - The process-wide role index
+"""
+import asyncio
+import hikari
+import time
+import typing as t
+
+
+class RoleNotFound(LookupError):
+    pass
+
+
+class RoleIndex:
+    """
+    An index of role IDs to guild IDs.
+
+    The index is kept up to date from the gateway cache and from role and
+    guild events. On top of that, it caches the full role list of a guild
+    for a short time whenever one has to be fetched, so that a burst of
+    misses in the same guild only ever results in a single request.
+
+    Attributes
+    ----------
+    TTL : int
+        The number of seconds a fetched role list is considered fresh.
+    """
+    TTL = 300
+
+    def __init__(self):
+        self._guilds: t.Dict[int, int] = {}
+        self._roles: t.Dict[int, t.Tuple[float, t.Dict[int, hikari.Role]]] = {}
+        self._fetches: t.Dict[int, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def add(self, role: hikari.Role) -> None:
+        self._guilds[role.id] = role.guild_id
+        try:
+            self._roles[role.guild_id][1][role.id] = role
+        except KeyError:
+            pass
+
+    def remove(self, role_id: int) -> None:
+        guild_id = self._guilds.pop(role_id, None)
+        try:
+            self._roles[guild_id][1].pop(role_id, None)
+        except KeyError:
+            pass
+
+    def add_guild(self, guild_id: int, roles: t.Iterable[hikari.Role]) -> None:
+        for role in roles:
+            self._guilds[role.id] = guild_id
+
+    def remove_guild(self, guild_id: int) -> None:
+        self._roles.pop(guild_id, None)
+        for role_id, role_guild_id in list(self._guilds.items()):
+            if role_guild_id == guild_id:
+                self._guilds.pop(role_id, None)
+
+    def seed(self, bot: hikari.GatewayBot) -> None:
+        """Populate the index from the gateway cache."""
+        for role in bot.cache.get_roles_view().values():
+            self._guilds[role.id] = role.guild_id
+
+    async def get_guild_id(self, role_id: int) -> t.Optional[int]:
+        """
+        Get the ID of the guild a role belongs to.
+
+        If the role isn't indexed, the database is consulted, as every
+        role the bot has ever seen is stored there along with its guild.
+        """
+        guild_id = self._guilds.get(role_id)
+        if guild_id is None:
+            from .models import Role
+            guild_id = await Role.objects.filter(id=role_id).values_list("guild_id", flat=True).afirst()
+            if guild_id is not None:
+                self._guilds[role_id] = guild_id
+        return guild_id
+
+    async def fetch_roles(self, bot: hikari.GatewayBot, guild_id: int) -> t.Dict[int, hikari.Role]:
+        """
+        Get the roles of a guild, fetching them if they aren't fresh.
+
+        Concurrent calls for the same guild share the same request.
+        """
+        cached = self._roles.get(guild_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        fetch = self._fetches.get(guild_id)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch_roles(bot, guild_id))
+            self._fetches[guild_id] = fetch
+            fetch.add_done_callback(lambda _: self._fetches.pop(guild_id, None))
+        return await asyncio.shield(fetch)
+
+    async def _fetch_roles(self, bot: hikari.GatewayBot, guild_id: int) -> t.Dict[int, hikari.Role]:
+        try:
+            roles = {role.id: role for role in await bot.rest.fetch_roles(guild_id)}
+        except (hikari.NotFoundError, hikari.ForbiddenError):
+            roles = {}
+
+        for role_id in roles:
+            self._guilds[role_id] = guild_id
+        self._roles[guild_id] = (time.monotonic() + self.TTL, roles)
+        return roles
+
+    async def aresolve(self, bot: hikari.GatewayBot, role_id: int) -> t.Union[hikari.Role, RoleNotFound]:
+        """
+        Resolve a role which isn't in the gateway cache.
+
+        Returns
+        -------
+        hikari.Role | RoleNotFound
+            The role, or an error if it could not be found.
+        """
+        guild_id = await self.get_guild_id(role_id)
+        if guild_id is None:
+            return RoleNotFound(f"The role ID {role_id} does not belong to any known guild.")
+
+        role = (await self.fetch_roles(bot, guild_id)).get(role_id)
+        if role is None:
+            return RoleNotFound(f"The role ID {role_id} could not be resolved.")
+        return role
+
+
+role_index: RoleIndex = RoleIndex()
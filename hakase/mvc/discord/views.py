@@ -3,7 +3,7 @@ from django.http import HttpResponse
 from ...core.conf import Config
 from ..core.utils import template
 from ..core.oauth2 import require_oauth2
-from ..discord.models import Guild
+from ..discord.models import Guild, aresolve_many
 
 
 conf = Config.load()
@@ -35,13 +35,9 @@ async def tags(request):
                 'tag_roles': {}
             }
 
-            roles_exist = False
-            roles = []
-            async for role in g.tag_roles.all():
-                roles_exist = True
-                role.attach_bot(request.bot)
-                await role.aresolve_all()
-                roles.append(role)
+            roles = [role async for role in g.tag_roles.all()]
+            roles_exist = len(roles) != 0
+            await aresolve_many(roles, bot=request.bot)
             
             for role in sorted(roles, key=lambda r: r.obj.name):
                 guilds[guild.id]['tag_roles'][role.id] = {
@@ -1,10 +1,9 @@
-import aiofile
 import colorlog
 from django.db import models
-import hashlib
 import os
 
 from ....core.conf import Config, __VERSION__, __TAG__
+from ....lib.manifest import Manifest
 from ...core.models import BaseAsyncModel
 
 
@@ -21,6 +20,10 @@ class Revision(BaseAsyncModel):
         ".venv", "migrations", "logs", "static/admin", "bin"
     ]
 
+    MANIFEST = ".manifest.json"
+
+    _manifest = None
+
     hash = models.CharField(max_length=128, help_text="The SHA512 digest of the codebase.")
     lines = models.IntegerField(help_text="The number of code lines in the codebase.")
     chars = models.IntegerField(help_text="The number of code characters in the codebase.")
@@ -50,33 +53,21 @@ class Revision(BaseAsyncModel):
         return f"{self.version} R.{self.number} '{self.tag}'"
     
     @classmethod
-    async def recompute_current(cls):
-        lines = 0
-        chars = 0
-        files = 0
-        size = 0
-        hash = hashlib.sha512()
-
-        for subdir, dirs, fs in os.walk(os.path.join(conf.root)):
-            if not any([f in subdir for f in cls.EXCLUDE_FOLDERS]):
-                for file in fs:
-                    files += 1
-                    size += os.path.getsize(os.path.join(subdir, file))
+    def get_manifest(cls) -> Manifest:
+        """Get the manifest of the codebase, which is kept in memory once loaded."""
+        if cls._manifest is None:
+            cls._manifest = Manifest(
+                conf.root,
+                extensions=cls.CODE_EXTENSIONS,
+                exclude=cls.EXCLUDE_FOLDERS,
+                path=os.path.join(conf.root, cls.MANIFEST)
+            )
+        return cls._manifest
 
-                    if any([file.endswith(ext) for ext in cls.CODE_EXTENSIONS]):
-                        async with aiofile.async_open(os.path.join(subdir, file), "rb") as fh:
-                            data = await fh.read()
-                            hash.update(data)
-                            chars += len(data)
-                            data = list(reversed(data.split(b"\n")))
-                            for i, line in enumerate(data):
-                                if line == b"":
-                                    data.pop(i)
-                                else:
-                                    break
-                            lines += len(data)
-        
-        hash = hash.hexdigest()
+    @classmethod
+    async def recompute_current(cls):
+        manifest = cls.get_manifest()
+        await manifest.scan()
 
         try:
             last = await cls.objects.alatest()
@@ -88,11 +79,11 @@ class Revision(BaseAsyncModel):
             number = 0
         
         current = cls(
-            hash=hash,
-            lines=lines,
-            chars=chars,
-            files=files,
-            size=size,
+            hash=manifest.digest,
+            lines=manifest.lines,
+            chars=manifest.chars,
+            files=manifest.files,
+            size=manifest.size,
             number=number,
             version=__VERSION__,
             tag=__TAG__
@@ -16,10 +16,10 @@ class Reminder(DiscordBaseModel):
 
     @classmethod
     async def check_reminders(cls, bot):
-        async for reminder in cls.objects.all():
-            reminder = await cls.objects.select_related("user").aget(id=reminder.id)
-            if reminder.time <= utcnow():
-                await reminder.remind(bot)
+        # Due reminders are read up front, so that no cursor is held open while they're sent.
+        reminders = [reminder async for reminder in cls.objects.select_related("user").filter(time__lte=utcnow())]
+        for reminder in reminders:
+            await reminder.remind(bot)
 
     async def remind(self, bot):
         self.user.attach_bot(bot)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Starboard
+from .models import Starboard, StarredMessage
 from ..discord.models import Channel, Role
 from ..discord.admin import BaseDiscordForm, BaseDiscordAdmin, DiscordChoiceField, DiscordMultipleChoiceField
 
@@ -18,4 +18,5 @@ class StarboardAdmin(BaseDiscordAdmin):
     list_display = ('id', 'channel')
     
 
-admin.site.register(Starboard, StarboardAdmin)
\ No newline at end of file
+admin.site.register(Starboard, StarboardAdmin)
+admin.site.register(StarredMessage)
\ No newline at end of file
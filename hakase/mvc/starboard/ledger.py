@@ -0,0 +1,130 @@
+"""Module defining the starboard ledger
+
+The ledger records who currently stars which messages on which starboards,
+so that a message is only ever posted to a starboard once. Once posted,
+further stars and removed stars update the reaction count of the existing
+post in place.
+
+    * StarLedger - Class recording stars and unstars, and posting or updating starboard posts
+    * ledger - The process-wide starboard ledger
+"""
+import asyncio
+import hikari
+import typing as t
+
+from ...core.log import logger
+
+
+Key = t.Tuple[int, int]
+
+
+class StarLedger:
+    """
+    Records stars and unstars, and posts or updates starboard posts.
+
+    Changes to the stars of the same message on the same starboard are
+    coalesced. While one is being handled, any others which arrive are
+    gathered up, and handled together once it's done, with a single write
+    to the ledger, and at most one request to Discord. If a user stars and
+    unstars in the meantime, only the latest of the two counts.
+
+    A message is only ever posted once. If its stars fall back below the
+    threshold, the post stays up, and its count is updated like any other.
+
+    If handling a batch fails, the error is logged and the batch is put
+    back, to be retried along with the next change to the same message.
+    """
+    def __init__(self):
+        self._pending: t.Dict[Key, t.Dict[int, bool]] = {}
+        self._tasks: t.Dict[Key, asyncio.Task] = {}
+
+    async def star(self, bot: hikari.GatewayBot, starboard, guild_id: int, channel_id: int, message_id: int, user_id: int) -> None:
+        """
+        Record that a user starred a message on a starboard.
+
+        Parameters
+        ----------
+        bot : hikari.GatewayBot
+            The bot to post with.
+        starboard : Starboard
+            The starboard the message was starred on.
+        guild_id : int
+            The Discord ID of the guild the message was sent in.
+        channel_id : int
+            The Discord ID of the channel the message was sent in.
+        message_id : int
+            The Discord ID of the message.
+        user_id : int
+            The Discord ID of the user who starred it.
+        """
+        await self._queue(bot, starboard, guild_id, channel_id, message_id, user_id, True)
+
+    async def unstar(self, bot: hikari.GatewayBot, starboard, guild_id: int, channel_id: int, message_id: int, user_id: int) -> None:
+        """
+        Record that a user removed their star from a message on a starboard.
+
+        Takes the same parameters as star().
+        """
+        await self._queue(bot, starboard, guild_id, channel_id, message_id, user_id, False)
+
+    async def _queue(self, bot: hikari.GatewayBot, starboard, guild_id: int, channel_id: int, message_id: int, user_id: int, starred: bool) -> None:
+        key = (starboard.id, message_id)
+        self._pending.setdefault(key, {})[user_id] = starred
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.create_task(self._drain(key, bot, starboard, guild_id, channel_id, message_id))
+        await asyncio.shield(task)
+
+    async def _drain(self, key: Key, bot: hikari.GatewayBot, starboard, guild_id: int, channel_id: int, message_id: int) -> None:
+        try:
+            while key in self._pending:
+                changes = self._pending.pop(key)
+                try:
+                    await self._apply(bot, starboard, guild_id, channel_id, message_id, changes)
+                except Exception:
+                    logger.exception(f"Failed to record stars of message {message_id} on starboard {starboard.id}.")
+                    # Anything queued since is newer, so it takes precedence.
+                    pending = self._pending.setdefault(key, {})
+                    for user_id, starred in changes.items():
+                        pending.setdefault(user_id, starred)
+                    return
+        finally:
+            self._tasks.pop(key, None)
+
+    async def _apply(self, bot: hikari.GatewayBot, starboard, guild_id: int, channel_id: int, message_id: int, changes: t.Dict[int, bool]) -> None:
+        from django.apps import apps
+        StarredMessage = apps.get_model("starboard.StarredMessage")
+
+        added = {user_id for user_id, starred in changes.items() if starred}
+        removed = set(changes) - added
+        if added:
+            entry, _ = await StarredMessage.objects.aget_or_create(
+                starboard_id=starboard.id,
+                message_id=message_id,
+                defaults={'channel_id': channel_id}
+            )
+        else:
+            # Nothing to record for a message nobody has starred.
+            entry = await StarredMessage.objects.filter(starboard_id=starboard.id, message_id=message_id).afirst()
+            if entry is None:
+                return
+
+        reactors = [user_id for user_id in entry.reactors if user_id not in removed]
+        reactors.extend(sorted(added - set(reactors)))
+        if reactors == entry.reactors:
+            return
+        entry.reactors = reactors
+
+        if entry.post_id is not None:
+            try:
+                await bot.rest.edit_message(starboard.channel_id, entry.post_id, starboard.render_content(entry.count))
+            except hikari.NotFoundError:
+                # The post was deleted out from under us, so it's posted anew if it still qualifies.
+                entry.post_id = None
+        if entry.post_id is None and entry.count >= starboard.threshold:
+            post = await starboard.create_message(bot, guild_id, channel_id, message_id, count=entry.count)
+            entry.post_id = post.id
+        await entry.asave(update_fields=["reactors", "post_id"])
+
+
+ledger: StarLedger = StarLedger()
@@ -1,4 +1,6 @@
-from ..discord.models import DiscordBaseModel, Guild
+from ..discord.models import DiscordBaseModel
+from .router import router
+from .ledger import ledger
 from django.db import models
 
 
@@ -10,27 +12,31 @@ class Starboard(DiscordBaseModel):
     emoji = models.CharField(max_length=32, default="⭐🌟🌠", help_text="The emoji whose reactions activate this starboard.")
     message = models.TextField(default="☄️ Among the Stars ☄️", help_text="The message sent along with the starboard message to the aforementioned channel.")
     roles = models.ManyToManyField("discord.Role", help_text="The roles capable of using this starboard.")
+    threshold = models.PositiveIntegerField(default=1, help_text="The number of people who must react to a message before it's posted to this starboard.")
 
     @classmethod
     async def process_event(cls, event):
         await event.app.is_ready.wait()
 
-        guild, _ = await Guild.objects.aget_or_create(id=event.guild_id)
+        routes = await router.match(event.guild_id, event.emoji_name)
+        if not routes:
+            return
 
         if isinstance(event, hikari.GuildReactionAddEvent):
-            async for starboard in guild.starboards.all():
-                starboard = await Starboard.objects.select_related("channel").aget(id=starboard.id)
-                if event.emoji_name in starboard.emoji:
-                    async for role in starboard.roles.all():
-                        if role.id in event.member.role_ids:
-                            break
-                    else:
-                        continue
-                else:
-                    break
-                await starboard.create_message(event.app, event.guild_id, event.channel_id, event.message_id)
+            for route in routes:
+                if route.allows(event.member.role_ids):
+                    await ledger.star(event.app, route.starboard, event.guild_id, event.channel_id, event.message_id, event.user_id)
+        elif isinstance(event, hikari.GuildReactionDeleteEvent):
+            # Removals carry no member, and anyone who starred may unstar,
+            # so there's no role check. Unstarring a user who never starred
+            # does nothing.
+            for route in routes:
+                await ledger.unstar(event.app, route.starboard, event.guild_id, event.channel_id, event.message_id, event.user_id)
     
-    async def create_message(self, bot, guild_id, channel_id, message_id):
+    def render_content(self, count):
+        return f"{self.message} ({count} {'reaction' if count == 1 else 'reactions'})"
+
+    async def create_message(self, bot, guild_id, channel_id, message_id, count=1):
         message = await bot.rest.fetch_message(channel_id, message_id)
         embed = hikari.Embed(description=message.content)
 
@@ -49,7 +55,27 @@ class Starboard(DiscordBaseModel):
         embed.timestamp = message.timestamp
 
         return await bot.rest.create_message(
-            self.channel.id,
-            self.message,
+            self.channel_id,
+            self.render_content(count),
             embed=embed
         )
+
+
+class StarredMessage(DiscordBaseModel):
+    starboard = models.ForeignKey(Starboard, on_delete=models.CASCADE, related_name="starred_messages", help_text="The starboard the message was starred on.")
+    message_id = models.BigIntegerField(help_text="The Discord ID of the starred message.")
+    channel_id = models.BigIntegerField(help_text="The Discord ID of the channel the starred message was sent in.")
+    reactors = models.JSONField(default=list, blank=True, help_text="The Discord IDs of the people currently starring the message.")
+    post_id = models.BigIntegerField(null=True, blank=True, default=None, help_text="The Discord ID of the message posted to the starboard, if it has been posted.")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["starboard", "message_id"], name="unique_starred_message")
+        ]
+
+    @property
+    def count(self):
+        return len(self.reactors)
+
+    def __str__(self):
+        return f"MID: {self.message_id} ({self.count})"
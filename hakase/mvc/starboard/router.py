@@ -0,0 +1,97 @@
+"""Module defining the starboard router
+
+Every reaction added in every guild has to be checked against the starboards
+of its guild, and nearly all of them match none. The router keeps a table of
+guild IDs to starboards compiled in memory, so that a reaction which doesn't
+concern any starboard is turned away without touching the database.
+
+    * Route - Class representing a starboard, and the roles allowed to use it
+    * StarboardRouter - Class routing reactions to the starboards they concern
+    * router - The process-wide starboard router
+"""
+import typing as t
+
+from ..core.index import CompiledIndex
+
+
+class Route:
+    """
+    A starboard, and the roles allowed to use it.
+
+    Attributes
+    ----------
+    starboard : Starboard
+        The starboard. Its channel is not fetched, only its ID is known.
+    role_ids : t.FrozenSet[int]
+        The IDs of the roles allowed to use the starboard.
+    """
+    __slots__ = ("starboard", "role_ids")
+
+    def __init__(self, starboard, role_ids: t.FrozenSet[int]):
+        self.starboard = starboard
+        self.role_ids: t.FrozenSet[int] = role_ids
+
+    def allows(self, role_ids: t.Iterable[int]) -> bool:
+        return not self.role_ids.isdisjoint(role_ids)
+
+
+class StarboardRouter(CompiledIndex):
+    """
+    Routes reactions to the starboards they concern.
+
+    Which starboards an emoji matches in a guild is remembered, so
+    repeated reactions with the same emoji are a single lookup.
+
+    Attributes
+    ----------
+    MAX_MATCHES : int
+        The number of remembered matches held before they're started over.
+    """
+    MODELS = ("starboard.Starboard",)
+    RELATIONS = ("starboard.Starboard.roles", "discord.Guild.starboards")
+    MAX_MATCHES = 10000
+
+    def __init__(self):
+        super().__init__("starboard_router")
+        self._matches: t.Dict[t.Tuple[int, str], t.Tuple[Route, ...]] = {}
+
+    def compile(self) -> t.Dict[int, t.Tuple[Route, ...]]:
+        from django.apps import apps
+
+        Starboard = apps.get_model("starboard.Starboard")
+        Guild = apps.get_model("discord.Guild")
+
+        role_ids = {}
+        for starboard_id, role_id in Starboard.roles.through.objects.values_list("starboard_id", "role_id"):
+            role_ids.setdefault(starboard_id, set()).add(role_id)
+
+        starboards = {starboard.id: starboard for starboard in Starboard.objects.all()}
+        routes = {}
+        for guild_id, starboard_id in Guild.starboards.through.objects.values_list("guild_id", "starboard_id"):
+            route = Route(starboards[starboard_id], frozenset(role_ids.get(starboard_id, ())))
+            routes.setdefault(guild_id, []).append(route)
+        return {guild_id: tuple(guild_routes) for guild_id, guild_routes in routes.items()}
+
+    def invalidate(self) -> None:
+        super().invalidate()
+        self._matches = {}
+
+    async def match(self, guild_id: int, emoji_name: t.Optional[str]) -> t.Tuple[Route, ...]:
+        """Get the routes of the starboards in a guild which an emoji activates."""
+        if emoji_name is None:
+            return ()
+        key = (guild_id, emoji_name)
+        matches = self._matches.get(key)
+        if matches is not None:
+            return matches
+
+        index = await self.get()
+        matches = tuple([route for route in index.get(guild_id, ()) if emoji_name in route.starboard.emoji])
+        if self._index is index:
+            if len(self._matches) >= self.MAX_MATCHES:
+                self._matches = {}
+            self._matches[key] = matches
+        return matches
+
+
+router: StarboardRouter = StarboardRouter()